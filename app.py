@@ -1,15 +1,26 @@
+import os
 import streamlit as st
-import time
-from datetime import datetime
+from streamlit.errors import StreamlitAPIException
+import tracing
+from tracing import traced
+import session_tokens
+from session_tokens import TOKEN_PARAM, issue_token, read_token
+from themes import THEMES, build_theme_css, theme_stylesheet_href
 from utils import (
-    get_user_by_email, get_user_by_username, create_user, update_user, delete_user,
-    get_tasks, add_task, update_task, delete_task,
-    send_task_notification, verify_password, migrate_password, get_pending_tasks
+    get_user_credentials, DuplicateUserError, get_task, create_user, update_user,
+    start_account_deletion, get_account_deletion, get_session_epoch, revoke_sessions,
+    send_task_notification, verify_password, password_needs_rehash, migrate_password, update_task_optimistic,
+    add_task_deferred, delete_task_deferred, bulk_update_tasks, bulk_delete_tasks,
+    get_task_stats, get_filtered_tasks, get_tasks_page, start_reminders, TASK_PAGE_SIZE
 )
 
+# Painel de diagnóstico na barra lateral (ver tracing.py)
+DEBUG_PANEL = os.getenv("NEUROTASK_DEBUG") == "1"
+
 # =============================
 # Session State Initialization
 # =============================
+
 def init_session_state():
     if 'current_user' not in st.session_state:
         st.session_state.current_user = None
@@ -41,480 +52,149 @@ def init_session_state():
         st.session_state.confirm_delete = False
 
 # =============================
-# Theme Configuration - Cores Suaves e Pastéis
+# Session Token (ver session_tokens.py)
 # =============================
-THEMES = {
-    "light_lavender": {
-        "name": "Lavanda Claro (Foco)",
-        "primary": "#F3E5F5",
-        "secondary": "#E1BEE7",
-        "accent": "#D7C4F3",
-        "background": "#FAFAFA",
-        "surface": "#FFFFFF",
-        "text": "#6A1B9A",
-        "text_secondary": "#7B1FA2",
-        "success": "#A5D6A7", # Verde Suave (Baixa)
-
-        "warning": "#FFE082", # Amarelo Suave (Média)
-
-        "error": "#EF9A9A", # Vermelho Suave (Alta)
-
-        "border": "#E0E0E0",
-        "shadow": "rgba(0, 0, 0, 0.08)",
-        "hover": "#F5F5F5"
-    },
-    "light_mint": {
-        "name": "Menta Claro (Calma)",
-        "primary": "#E8F5E9",
-        "secondary": "#C8E6C9",
-        "accent": "#81C784",
-        "background": "#FAFAFA",
-        "surface": "#FFFFFF",
-        "text": "#2E7D32",
-        "text_secondary": "#66BB6A",
-        "success": "#A5D6A7", # Verde Suave (Baixa)
-
-        "warning": "#FFE082", # Amarelo Suave (Média)
+def restore_session():
+    """Restaura usuário e tema do token assinado na URL (só confere o epoch no banco)"""
+    if st.session_state.current_user is not None or not session_tokens.enabled():
+        return
+    token = st.query_params.get(TOKEN_PARAM)
+    if not token:
+        return
+    session = read_token(token)
+    # Token revogado (logout) ou de uma conta que já não existe
+    if session is None or get_session_epoch(session[0]["id"]) != session[0]["session_epoch"]:
+        del st.query_params[TOKEN_PARAM]
+        return
+    user, theme = session
+    st.session_state.current_user = user
+    if theme in THEMES:
+        st.session_state.current_theme = theme
+    st.session_state.session_token = (token, theme)
+    if st.session_state.current_screen in ("login", "register"):
+        st.session_state.current_screen = "dashboard"
 
-        "error": "#EF9A9A", # Vermelho Suave (Alta)
+def sync_session_token():
+    """Reemite o token quando o tema muda (ou ele some da URL)"""
+    if not session_tokens.enabled():
+        return
+    theme = st.session_state.current_theme
+    saved = st.session_state.get("session_token")
+    if saved and saved[1] == theme and st.query_params.get(TOKEN_PARAM) == saved[0]:
+        return
+    user = st.session_state.current_user
+    if "session_epoch" not in user:
+        # Lido uma vez por login; sem ele o token não poderia ser revogado depois
+        user["session_epoch"] = get_session_epoch(user["id"])
+    if user["session_epoch"] is None:
+        return
+    token = issue_token(user, theme)
+    st.query_params[TOKEN_PARAM] = token
+    st.session_state.session_token = (token, theme)
 
-        "border": "#E0E0E0",
-        "shadow": "rgba(0, 0, 0, 0.08)",
-        "hover": "#F5F5F5"
-    },
-    "light_peach": {
-        "name": "Pêssego Claro (Acolhedor)",
-        "primary": "#FFF3E0",
-        "secondary": "#FFE0B2",
-        "accent": "#FFB74D",
-        "background": "#FAFAFA",
-        "surface": "#FFFFFF",
-        "text": "#E65100",
-        "text_secondary": "#FF9800",
-        "success": "#C5E1A5",
-        "warning": "#FFCC80",
-        "error": "#FFAB91",
-        "border": "#E0E0E0",
-        "shadow": "rgba(0, 0, 0, 0.08)",
-        "hover": "#FFF8F0"
-    },
-    "dark_lavender": {
-        "name": "Lavanda Escuro (Foco)",
-        "primary": "#311B92",
-        "secondary": "#4527A0",
-        "accent": "#D7C4F3",
-        "background": "#1A1A1A",
-        "surface": "#263238",
-        "text": "#6A1B9A",
-        "text_secondary": "#CE93D8",
-        "success": "#81C784",
-        "warning": "#FFD54F",
-        "error": "#E57373",
-        "border": "#37474F",
-        "shadow": "rgba(0, 0, 0, 0.3)",
-        "hover": "#2C393F"
-    },
- "dark_mint": {
-    "name": "Menta Escuro (Calma)",
-    "primary": "#145A1A",
-    "secondary": "#1C7A2A",
-    "accent": "#81C784",
-    "background": "#121212",
-    "surface": "#1E272C",
-    "text": "#1C8701",
-    "text_secondary": "#B2DFDB",
-    "success": "#66BB6A",
-    "warning": "#FFD54F",
-    "error": "#E57373",
-    "border": "#37474F",
-    "shadow": "rgba(0, 0, 0, 0.5)",
-    "hover": "#263238"
-},
-    "dark_brown": {
-        "name": "Marrom Escuro (Acolhedor)",
-        "primary": "#A06F53",
-        "secondary": "#4E342E",
-        "accent": "#FFAB40",
-        "background": "#1A1A1A",
-        "surface": "#3E2723",
-        "text": "#5E3206",
-        "text_secondary": "#BCAAA4",
-        "success": "#AED581",
-        "warning": "#FFB74D",
-        "error": "#FF8A65",
-        "border": "#4E342E",
-        "shadow": "rgba(0, 0, 0, 0.3)",
-        "hover": "#4A2C24"
-    }
-}
+def clear_session_token():
+    if TOKEN_PARAM in st.query_params:
+        del st.query_params[TOKEN_PARAM]
 
+@traced()
 def apply_theme_css():
-    theme = THEMES[st.session_state.current_theme]
-    
-    css = f"""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    * {{
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        box-sizing: border-box;
-    }}
-    
-    .main {{
-        background-color: {theme['background']};
-        padding: 0;
-    }}
-    
-    .block-container {{
-        padding: 2rem 1rem;
-        max-width: 1400px;
-    }}
-    
-    /* Task Cards - Blocos Visuais Dinâmicos */
-    .task-card {{
-        background: {theme['surface']};
-        border: 1px solid {theme['border']};
-        border-radius: 12px;
-        padding: 20px 24px;
-        margin: 16px 0;
-        box-shadow: 0 2px 8px {theme['shadow']};
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        position: relative;
-        overflow: hidden;
-    }}
-    
-    .task-card::before {{
-        content: '';
-        position: absolute;
-        left: 0;
-        top: 0;
-        bottom: 0;
-        width: 4px;
-        background: {theme['accent']};
-        transition: width 0.3s ease;
-    }}
-    
-    .task-card:hover {{
-        box-shadow: 0 6px 20px {theme['shadow']};
-        transform: translateY(-2px);
-        border-color: {theme['accent']};
-    }}
-    
-    .task-card:hover::before {{
-        width: 6px;
-    }}
-    
-    .task-completed {{
-        opacity: 0.65;
-        background: {theme['primary']};
-    }}
-    
-    .task-completed::before {{
-        background: {theme['success']} !important;
-    }}
-    
-    /* Cores de Prioridade Suaves - Bordas */
-    .task-priority-high::before {{
-        background: {theme['error']} !important; /* Vermelho Suave */
-    }}
-    
-    .task-priority-medium::before {{
-        background: {theme['warning']} !important; /* Amarelo Suave */
-    }}
-    
-    .task-priority-low::before {{
-        background: {theme['success']} !important; /* Verde Suave */
-    }}
-    
-    .task-title {{
-        font-size: 18px;
-        font-weight: 600;
-        color: {theme['text']};
-        margin: 0 0 8px 0;
-        line-height: 1.4;
-    }}
-    
-    .task-description {{
-        font-size: 14px;
-        color: {theme['text_secondary']};
-        margin: 8px 0;
-        line-height: 1.6;
-    }}
-    
-    .task-meta {{
-        font-size: 13px;
-        color: {theme['text_secondary']};
-        margin-top: 12px;
-        display: flex;
-        gap: 16px;
-        flex-wrap: wrap;
-    }}
-    
-    .task-meta-item {{
-        display: inline-flex;
-        align-items: center;
-        gap: 4px;
-    }}
-    
-    /* Priority Badges */
-    .priority-badge {{
-        display: inline-block;
-        padding: 4px 12px;
-        border-radius: 16px;
-        font-size: 11px;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }}
-    
-    /* Cores de Prioridade Suaves - Badges */
-    .priority-high {{
-        background: {theme['error']};
-        color: {theme['text']}; /* Texto escuro para contraste suave */
-    }}
-    
-    .priority-medium {{
-        background: {theme['warning']};
-        color: {theme['text']};
-    }}
-    
-    .priority-low {{
-        background: {theme['success']};
-        color: {theme['text']}; /* Texto escuro para contraste suave */
-    }}
-    
-    /* Stats Cards */
-    .stats-card {{
-        background: {theme['surface']};
-        border: 1px solid {theme['border']};
-        padding: 24px;
-        border-radius: 12px;
-        text-align: center;
-        box-shadow: 0 2px 8px {theme['shadow']};
-        transition: all 0.3s ease;
-    }}
-    
-    .stats-card:hover {{
-        transform: translateY(-4px);
-        box-shadow: 0 6px 16px {theme['shadow']};
-    }}
-    
-    .stats-number {{
-        font-size: 36px;
-        font-weight: 700;
-        color: {theme['accent']};
-        line-height: 1;
-        margin-bottom: 8px;
-    }}
-    
-    .stats-label {{
-        font-size: 12px;
-        color: {theme['text_secondary']};
-        font-weight: 500;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }}
-    
-    /* Page Headers */
-    .page-header {{
-        font-size: 32px;
-        font-weight: 700;
-        color: {theme['text']};
-        margin-bottom: 8px;
-        letter-spacing: -0.5px;
-    }}
-    
-    .page-subtitle {{
-        font-size: 16px;
-        color: {theme['text_secondary']};
-        margin-bottom: 32px;
-    }}
-    
-    .section-title {{
-        font-size: 14px;
-        font-weight: 600;
-        color: {theme['text_secondary']};
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        margin: 32px 0 16px 0;
-    }}
-    
-    /* Profile Card */
-    .profile-card {{
-        background: {theme['surface']};
-        border-radius: 12px;
-        padding: 32px;
-        box-shadow: 0 2px 8px {theme['shadow']};
-        border: 1px solid {theme['border']};
-    }}
-    
-    /* Buttons */
-    .stButton button {{
-        background-color: {theme['accent']};
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 12px 24px;
-        font-weight: 500;
-        font-size: 14px;
-        transition: all 0.2s ease;
-        width: 100%;
-    }}
-    
-    .stButton button:hover {{
-        background-color: {theme['accent']};
-        opacity: 0.9;
-        transform: translateY(-1px);
-        box-shadow: 0 4px 12px {theme['shadow']};
-    }}
-    
-    /* Sidebar */
-    div[data-testid="stSidebarContent"] {{
-        background-color: {theme['surface']};
-        border-right: 1px solid {theme['border']};
-    }}
-    
-    /* Forms */
-    .stTextInput input, .stTextArea textarea, .stSelectbox select {{
-        border-radius: 8px;
-        border: 1px solid {theme['border']};
-        background-color: {theme['surface']};
-        color: {theme['text']};
-        padding: 12px;
-        font-size: 14px;
-    }}
-    
-    .stTextInput input:focus, .stTextArea textarea:focus {{
-        border-color: {theme['accent']};
-        box-shadow: 0 0 0 2px {theme['primary']};
-    }}
-    
-    /* Checkbox */
-    .stCheckbox {{
-        margin-top: 8px;
-    }}
-    
-    /* Mobile Responsive */
-    @media (max-width: 768px) {{
-        .block-container {{
-            padding: 1rem 0.5rem;
-        }}
-        
-        .task-card {{
-            padding: 16px;
-            margin: 12px 0;
-        }}
-        
-        .task-title {{
-            font-size: 16px;
-        }}
-        
-        .stats-number {{
-            font-size: 28px;
-        }}
-        
-        .page-header {{
-            font-size: 24px;
-        }}
-    }}
-    
-    /* Notification */
-    .notification-popup {{
-        position: fixed;
-        bottom: 20px;
-        right: 20px;
-        background-color: {theme['surface']};
-        color: {theme['text']};
-        padding: 15px 25px;
-        border-radius: 8px;
-        box-shadow: 0 4px 12px {theme['shadow']};
-        border-left: 5px solid {theme['accent']};
-        z-index: 1000;
-        opacity: 0;
-        transform: translateY(20px);
-        transition: opacity 0.3s ease-out, transform 0.3s ease-out;
-    }}
-    
-    .notification-popup.show {{
-        opacity: 1;
-        transform: translateY(0);
-    }}
-    
-    .notification-title {{
-        font-weight: 600;
-        margin-bottom: 5px;
-    }}
-    
-    .notification-time {{
-        font-size: 12px;
-        color: {theme['text_secondary']};
-    }}
-    
-    /* Login Screen Specific Styles */
-    .login-container {{
-        background-color: transparent; /* Fundo transparente para não criar uma caixa branca */
-        padding: 40px;
-        border-radius: 16px;
-        box-shadow: none; /* Sem sombra */
-        max-width: 500px;
-        margin: 80px auto;
-        border: none; /* Sem borda */
-    }}
-    
-    .login-header {{
-        font-size: 40px;
-        font-weight: 800;
-        color: {theme['accent']}; /* Destaque com a cor de acento */
-        text-align: center;
-        margin-bottom: 10px;
-        letter-spacing: 1px;
-        text-shadow: 1px 1px 2px {theme['shadow']};
-    }}
-    
-    .login-slogan {{
-        font-size: 18px;
-        font-weight: 500;
-        color: {theme['text_secondary']};
-        text-align: center;
-        margin-bottom: 30px;
-        line-height: 1.4;
-    }}
-    
-    /* Streamlit Overrides */
-    div[data-testid="stAppViewBlockContainer"] {{
-        background-color: {theme['background']};
-    }}
-    
-    /* Fix for Streamlit's default header/footer */
-    header {{
-        background-color: transparent !important;
-    }}
-    
-    footer {{
-        visibility: hidden;
-    }}
-    
-    </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
+    # Cada rerun precisa reenviar o estilo (o Streamlit remove elementos não
+    # emitidos), mas basta uma vez por execução
+    if st.session_state.get("theme_css_applied"):
+        return
+    st.session_state.theme_css_applied = True
+    
+    theme_key = st.session_state.current_theme
+    # static/ só é servida com o tipo certo (text/css) a partir do Streamlit 1.57,
+    # ver requirements.txt; sem servidor de estáticos o CSS vai inline
+    href = theme_stylesheet_href(theme_key) if st.get_option("server.enableStaticServing") else None
+    if href:
+        # Arquivo versionado pelo hash: navegador e service worker podem guardá-lo para sempre
+        st.markdown(f'<link rel="stylesheet" href="{href}">', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{build_theme_css(theme_key)}</style>", unsafe_allow_html=True)
 
 # =============================
 # Helper Functions
 # =============================
 def get_user_stats(user_id):
-    tasks = get_tasks(user_id)
-    total = len(tasks)
-    completed = len([t for t in tasks if t.get("completed", False)])
-    pending = total - completed
-    completion_rate = (completed / total * 100) if total > 0 else 0
-    return {"total": total, "completed": completed, "pending": pending, "completion_rate": completion_rate}
+    """Contadores do usuário, buscados uma única vez por rerun."""
+    stats = st.session_state.get("task_stats")
+    if stats is None or stats["user_id"] != user_id:
+        stats = {**get_task_stats(user_id), "user_id": user_id}
+        st.session_state.task_stats = stats
+    return stats
+
+def get_task_filters():
+    """Filtros da lista de tarefas guardados na sessão."""
+    return {
+        "priority": st.session_state.filter_priority,
+        "task_type": st.session_state.filter_type,
+        "sort": st.session_state.filter_sort
+    }
+
+def stat_cards(cards):
+    """Cartões de contador lado a lado; cards é uma lista de (chave, rótulo).
+    
+    Ações que mudam os contadores fazem um rerun completo (as leituras vêm do cache).
+    """
+    stats = get_user_stats(st.session_state.current_user["id"])
+    for column, (value_key, label) in zip(st.columns(len(cards)), cards):
+        with column:
+            st.markdown(f'<div class="stats-card"><div class="stats-number">{stats[value_key]}</div><div class="stats-label">{label}</div></div>', unsafe_allow_html=True)
+
+def rerun_fragment():
+    """Reexecuta só o fragmento atual; fora de um rerun de fragmento, a página toda."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def queue_toast(message, icon=None):
+    """Agenda um toast para o próximo rerun (st.rerun descarta os da execução atual)."""
+    st.session_state.setdefault("queued_toasts", []).append((message, icon))
+
+def flush_toasts():
+    for message, icon in st.session_state.pop("queued_toasts", []):
+        st.toast(message, icon=icon)
+
+def track_write(future, task_id, title):
+    """Guarda a escrita em segundo plano para avisar o usuário se ela falhar."""
+    st.session_state.setdefault("pending_writes", []).append((future, task_id, title))
+
+def process_pending_writes():
+    """Confere as escritas otimistas; o cache já foi revertido se alguma falhou."""
+    still_pending = []
+    for future, task_id, title in st.session_state.get("pending_writes", []):
+        if not future.done():
+            still_pending.append((future, task_id, title))
+        elif future.exception() is not None:
+            # Descarta o estado dos checkboxes para refletirem o valor restaurado
+            for key in [k for k in st.session_state if str(k).startswith(f"task_check_{task_id}_")]:
+                del st.session_state[key]
+            st.toast(f"Não foi possível salvar '{title}'. A alteração foi desfeita.", icon="⚠️")
+    st.session_state.pending_writes = still_pending
+
+# Intervalo com que watch_pending_writes confere as escritas da sessão
+WRITE_POLL_SECONDS = 1
+
+@st.fragment(run_every=WRITE_POLL_SECONDS)
+def watch_pending_writes():
+    """Mostra quantas escritas da sessão faltam e, quando terminam, pede um rerun completo.
+    
+    Só é desenhado enquanto há escritas pendentes: o rerun completo roda
+    process_pending_writes (toast e valor restaurado em caso de falha) e, sem
+    pendências, o fragmento deixa de existir junto com o seu timer.
+    """
+    pending = [future for future, _, _ in st.session_state.get("pending_writes", []) if not future.done()]
+    if not pending:
+        st.rerun()
+    st.caption(f"Salvando {len(pending)} alteração(ões)...")
 
 # =============================
 # Screen Functions
 # =============================
 def tela_login():
-    apply_theme_css() 
-    
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
@@ -533,20 +213,21 @@ def tela_login():
                     st.error("Preencha todos os campos")
                     return
                 
-                user = get_user_by_email(email.lower())
+                user = get_user_credentials(email.lower())
                 
                 if user and verify_password(senha, user.get("password", "")):
-                    if not user.get("password", "").startswith('$2b$'):
-                        migrate_password(user["id"], email.lower(), senha, user.get("password", ""))
+                    if password_needs_rehash(user.get("password", "")):
+                        migrate_password(email.lower(), senha)
                     
+                    # O hash da senha não fica guardado na sessão
+                    user.pop("password", None)
                     st.session_state.current_user = user
                     
                     saved_theme = user.get("theme_settings", {}).get("current_theme")
                     if saved_theme and saved_theme in THEMES:
                         st.session_state.current_theme = saved_theme
                     
-                    st.success("Login bem-sucedido!")
-                    time.sleep(0.5)
+                    queue_toast("Login bem-sucedido!", icon="✅")
                     st.session_state.current_screen = "dashboard"
                     st.rerun()
                 else:
@@ -560,8 +241,6 @@ def tela_login():
         st.markdown('</div>', unsafe_allow_html=True)
 
 def tela_registro():
-    apply_theme_css()
-    
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
@@ -583,20 +262,19 @@ def tela_registro():
                 if senha != confirmar_senha:
                     st.error("Senhas não coincidem")
                     return
-                if get_user_by_email(email.lower()):
-                    st.error("Email já cadastrado")
-                    return
-                if get_user_by_username(usuario):
-                    st.error("Nome de usuário já em uso")
-                    return
                 
+                # Email e usuário únicos: o próprio insert recusa duplicados
                 try:
                     novo = create_user(usuario, email.lower(), senha, theme="light_lavender")
                     if novo:
-                        st.success("Registro bem-sucedido! Faça login.")
-                        time.sleep(0.5)
+                        queue_toast("Registro bem-sucedido! Faça login.", icon="✅")
                         st.session_state.current_screen = "login"
                         st.rerun()
+                except DuplicateUserError as e:
+                    if e.field == "username":
+                        st.error("Nome de usuário já em uso")
+                    else:
+                        st.error("Email já cadastrado")
                 except Exception as e:
                     st.error(f"Erro ao criar conta: {str(e)}")
         
@@ -608,18 +286,16 @@ def tela_registro():
 # =============================
 # Sidebar Menu
 # =============================
+@traced()
 def mostrar_menu_lateral():
     with st.sidebar:
         user = st.session_state.current_user
         st.markdown(f'<div class="page-header" style="font-size: 20px; margin-bottom: 8px;">Olá, {user.get("username", "Usuário")}</div>', unsafe_allow_html=True)
         
-        stats = get_user_stats(user["id"])
+        stat_cards([("pending", "Pendentes"), ("completed", "Concluídas")])
         
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown(f'<div class="stats-card"><div class="stats-number">{stats["pending"]}</div><div class="stats-label">Pendentes</div></div>', unsafe_allow_html=True)
-        with col2:
-            st.markdown(f'<div class="stats-card"><div class="stats-number">{stats["completed"]}</div><div class="stats-label">Concluídas</div></div>', unsafe_allow_html=True)
+        if st.session_state.get("pending_writes"):
+            watch_pending_writes()
         
         st.markdown('<div class="section-title" style="margin-top: 32px;">Menu</div>', unsafe_allow_html=True)
         
@@ -669,11 +345,37 @@ def mostrar_menu_lateral():
         if st.button("Sair", use_container_width=True, key="btn_sair"):
             if st.session_state.current_user:
                 update_user(st.session_state.current_user["email"], {"theme_settings": {"current_theme": st.session_state.current_theme}})
+                revoke_sessions(st.session_state.current_user["id"])
             
+            clear_session_token()
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             init_session_state()
             st.rerun()
+        
+        if DEBUG_PANEL:
+            render_debug_panel()
+
+def render_debug_panel():
+    """Spans da execução anterior (NEUROTASK_DEBUG=1), com exportação."""
+    trace = st.session_state.get("last_trace")
+    with st.expander("Diagnóstico"):
+        if trace is None:
+            st.caption("Nenhuma execução registrada ainda.")
+        else:
+            st.caption(f"Execução anterior ({trace.name}): {trace.duration * 1000:.1f} ms, "
+                       f"{trace.query_count} consultas (orçamento {tracing.QUERY_BUDGET})")
+            for violation in trace.budget_violations():
+                st.warning(violation)
+            st.dataframe(
+                [{"span": name, "chamadas": calls, "total (ms)": round(total, 2), "máx (ms)": round(longest, 2)}
+                 for name, calls, total, longest in trace.summary()],
+                hide_index=True, use_container_width=True
+            )
+        st.download_button("Exportar Prometheus", tracing.prometheus_text(), file_name="neurotask.prom",
+                           mime="text/plain", use_container_width=True, key="debug_export_prom")
+        st.download_button("Exportar JSONL", tracing.jsonl_text(), file_name="neurotask-traces.jsonl",
+                           mime="application/jsonl", use_container_width=True, key="debug_export_jsonl")
 
 # =============================
 # Profile Screen
@@ -709,6 +411,11 @@ def mostrar_perfil():
     st.markdown("--")
     
     st.markdown("### Zona de Perigo")
+    
+    if get_account_deletion(user["id"]) is not None:
+        account_deletion_progress(user)
+        return
+    
     st.warning("**Atenção:** Esta ação é irreversível!")
     
     if st.button("Excluir Conta Permanentemente"):
@@ -720,11 +427,8 @@ def mostrar_perfil():
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Sim, excluir"):
-                delete_user(user['email'])
-                st.success("Conta excluída com sucesso!")
-                for key in list(st.session_state.keys()):
-                    del st.session_state[key]
-                init_session_state()
+                # Roda em segundo plano; o progresso aparece no lugar dos botões
+                start_account_deletion(user["id"], user["email"])
                 st.rerun()
         
         with col2:
@@ -737,6 +441,30 @@ def mostrar_perfil():
         st.session_state.current_screen = "dashboard"
         st.rerun()
 
+@st.fragment(run_every=1)
+def account_deletion_progress(user):
+    """Acompanha a exclusão da conta sem travar a página"""
+    job = get_account_deletion(user["id"])
+    if job.status == "done":
+        clear_session_token()
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+        init_session_state()
+        queue_toast("Conta excluída com sucesso!", icon="✅")
+        st.rerun()
+    
+    if job.status == "failed":
+        st.error(f"Erro ao excluir conta: {job.error}")
+        if st.button("Tentar novamente", key="retry_account_delete"):
+            start_account_deletion(user["id"], user["email"])
+            rerun_fragment()
+        return
+    
+    if job.total is None:
+        st.progress(0.0, text="Preparando exclusão...")
+    else:
+        st.progress(job.progress, text=f"Excluindo tarefas: {job.deleted} de {job.total}")
+
 # =============================
 # Settings Screen
 # =============================
@@ -805,16 +533,41 @@ def tela_configuracoes():
 # =============================
 # Task Management
 # =============================
-def render_task_card(tarefa, container_type="normal"):
-    priority_class = ""
-    if tarefa.get("priority") == "high":
-        priority_class = "task-priority-high"
-    elif tarefa.get("priority") == "medium":
-        priority_class = "task-priority-medium"
-    else:
-        priority_class = "task-priority-low"
+PRIORITY_CLASSES = {"high": "task-priority-high", "medium": "task-priority-medium", "low": "task-priority-low"}
+PRIORITY_BADGES = {
+    "high": '<span class="priority-badge priority-high">Alta</span>',
+    "medium": '<span class="priority-badge priority-medium">Média</span>',
+    "low": '<span class="priority-badge priority-low">Baixa</span>'
+}
+
+def render_completion_checkbox(tarefa, container_type):
+    concluida = st.checkbox(
+        "✓", 
+        value=tarefa.completed, 
+        key=f"task_check_{tarefa.id}_{container_type}",
+        label_visibility="collapsed"
+    )
+    
+    if concluida != tarefa.completed:
+        # Atualiza o cache na hora; a gravação é confirmada em segundo plano
+        future = update_task_optimistic(tarefa.id, tarefa.user_id, {"completed": concluida})
+        track_write(future, tarefa.id, tarefa.title)
+        # Adiciona uma notificação de sucesso para a conclusão
+        if concluida:
+            queue_toast(f"🎉 Tarefa '{tarefa.title}' concluída! Ótimo trabalho!", icon="✅")
+        else:
+            queue_toast(f"🔄 Tarefa '{tarefa.title}' reativada.", icon="↩️")
+        # Rerun completo: a lista e os contadores já refletem a alteração no cache
+        st.rerun()
+
+@st.fragment
+@traced()
+def render_task_card(tarefa, container_type="normal", selectable=False):
+    # Em reruns só do card o main() não roda; os toasts pendentes saem daqui
+    flush_toasts()
     
-    completed_class = "task-completed" if tarefa.get("completed", False) else ""
+    priority_class = PRIORITY_CLASSES.get(tarefa.priority, "task-priority-low")
+    completed_class = "task-completed" if tarefa.completed else ""
     
     card_class = f"task-card {priority_class} {completed_class}"
     
@@ -824,112 +577,77 @@ def render_task_card(tarefa, container_type="normal"):
         col1, col2, col3 = st.columns([0.5, 5, 1.5])
         
         with col1:
-            concluida = st.checkbox(
-                "✓", 
-                value=tarefa.get("completed", False), 
-                key=f"task_check_{tarefa['id']}_{container_type}",
-                label_visibility="collapsed"
-            )
-            
-            if concluida != tarefa.get("completed", False):
-                update_task(tarefa["id"], {"completed": concluida})
-                # Adiciona uma notificação de sucesso para a conclusão
-                if concluida:
-                    st.toast(f"🎉 Tarefa '{tarefa['title']}' concluída! Ótimo trabalho!", icon="✅")
-                else:
-                    st.toast(f"🔄 Tarefa '{tarefa['title']}' reativada.", icon="↩️")
-                time.sleep(0.1) # Pequeno delay para garantir que o toast apareça antes do rerun
-                st.rerun()
+            if selectable:
+                # No modo de seleção múltipla o checkbox marca a tarefa para as ações em lote
+                st.checkbox("Selecionar", key=f"select_{container_type}_{tarefa.id}", label_visibility="collapsed")
+            else:
+                render_completion_checkbox(tarefa, container_type)
         
         with col2:
-            st.markdown(f'<div class="task-title">{tarefa["title"]}</div>', unsafe_allow_html=True)
-            if tarefa.get("description"):
-                st.markdown(f'<div class="task-description">{tarefa["description"]}</div>', unsafe_allow_html=True)
-            
-            meta_items = []
-            if tarefa.get("due_date"):
-                try:
-                    # Tenta parsear como datetime (com hora)
-                    if len(tarefa["due_date"]) > 10:
-                        date_obj = datetime.strptime(tarefa["due_date"], "%Y-%m-%d %H:%M")
-                        formatted_date = date_obj.strftime("%d/%m/%Y %H:%M")
-                    # Tenta parsear como date (sem hora)
-                    else:
-                        date_obj = datetime.strptime(tarefa["due_date"], "%Y-%m-%d")
-                        formatted_date = date_obj.strftime("%d/%m/%Y")
-                        
-                    meta_items.append(f'<span class="task-meta-item">📅 {formatted_date}</span>')
-                except ValueError:
-                    meta_items.append(f'<span class="task-meta-item">📅 {tarefa["due_date"]}</span>')
+            st.markdown(f'<div class="task-title">{tarefa.title}</div>', unsafe_allow_html=True)
             
-            priority_map = {
-                "high": f'<span class="priority-badge priority-high">Alta</span>',
-                "medium": f'<span class="priority-badge priority-medium">Média</span>',
-                "low": f'<span class="priority-badge priority-low">Baixa</span>'
-            }
-            
-            # Adiciona a data de criação
-            created_at_str = tarefa.get("created_at", "")
-            if created_at_str:
-                try:
-                    # O created_at vem do banco com formato ISO (ex: 2024-01-01T10:00:00.000000+00:00)
-                    created_date_obj = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-                    formatted_created_date = created_date_obj.strftime("%d/%m/%Y")
-                    meta_items.append(f'<span class="task-meta-item">Criada em: {formatted_created_date}</span>')
-                except ValueError:
-                    pass # Ignora se não conseguir formatar
+            # A descrição não vem na listagem; só é buscada quando o usuário abre os detalhes
+            task_details = st.session_state.setdefault("task_details", {})
+            if tarefa.id in task_details:
+                detail = task_details[tarefa.id]
+                if detail and detail.description:
+                    st.markdown(f'<div class="task-description">{detail.description}</div>', unsafe_allow_html=True)
+                else:
+                    st.markdown('<div class="task-description">Sem descrição.</div>', unsafe_allow_html=True)
             
-            meta_items.append(priority_map.get(tarefa.get("priority", "medium"), ""))
+            # Datas e rótulos já vêm formatados no Task
+            meta_items = []
+            if tarefa.due_label:
+                meta_items.append(f'<span class="task-meta-item">📅 {tarefa.due_label}</span>')
+            if tarefa.created_label:
+                meta_items.append(f'<span class="task-meta-item">Criada em: {tarefa.created_label}</span>')
+            meta_items.append(PRIORITY_BADGES.get(tarefa.priority, ""))
             
             st.markdown(f'<div class="task-meta">{"".join(meta_items)}</div>', unsafe_allow_html=True)
             
+            details_open = tarefa.id in task_details
+            if st.button("Ocultar detalhes" if details_open else "Ver detalhes", key=f"details_{tarefa.id}_{container_type}"):
+                if details_open:
+                    del task_details[tarefa.id]
+                else:
+                    task_details[tarefa.id] = get_task(tarefa.id)
+                rerun_fragment()
+            
         with col3:
             col_edit, col_delete = st.columns(2)
             
             with col_edit:
-                if st.button("Editar", key=f"edit_{tarefa['id']}_{container_type}", use_container_width=True):
-                    st.session_state.task_to_edit = tarefa
+                if st.button("Editar", key=f"edit_{tarefa.id}_{container_type}", use_container_width=True):
+                    # O formulário precisa da descrição completa
+                    st.session_state.task_to_edit = get_task(tarefa.id) or tarefa
                     st.session_state.show_task_form = True
                     st.rerun()
             
             with col_delete:
-                if st.button("Excluir", key=f"delete_{tarefa['id']}_{container_type}", use_container_width=True):
-                    delete_task(tarefa["id"])
-                    st.success("Tarefa excluída!")
+                if st.button("Excluir", key=f"delete_{tarefa.id}_{container_type}", use_container_width=True):
+                    track_write(delete_task_deferred(tarefa.id, tarefa.user_id), tarefa.id, tarefa.title)
+                    queue_toast("Tarefa excluída!")
                     st.rerun()
         
         st.markdown('</div>', unsafe_allow_html=True)
 
 def task_form():
-    is_edit = st.session_state.task_to_edit is not None
-    task_data = st.session_state.task_to_edit if is_edit else {}
+    task_data = st.session_state.task_to_edit
+    is_edit = task_data is not None
     
     st.markdown(f'<div class="page-header">{"Editar Tarefa" if is_edit else "Nova Tarefa"}</div>', unsafe_allow_html=True)
     
     with st.form("task_form_main", clear_on_submit=True):
-        title = st.text_input("Título da Tarefa", value=task_data.get("title", ""), placeholder="O que precisa ser feito?")
-        description = st.text_area("Descrição (Opcional)", value=task_data.get("description", ""), placeholder="Detalhes, sub-tarefas, notas...")
+        title = st.text_input("Título da Tarefa", value=task_data.title if is_edit else "", placeholder="O que precisa ser feito?")
+        description = st.text_area("Descrição (Opcional)", value=(task_data.description or "") if is_edit else "", placeholder="Detalhes, sub-tarefas, notas...")
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            # Data
-            due_date_full = task_data.get("due_date")
-            initial_date = None
-            initial_time = None
-            
-            if due_date_full:
-                try:
-                    # Tenta parsear como datetime (com hora)
-                    dt_obj = datetime.strptime(due_date_full, "%Y-%m-%d %H:%M")
-                    initial_date = dt_obj.date()
-                    initial_time = dt_obj.time()
-                except ValueError:
-                    try:
-                        # Tenta parsear como date (sem hora)
-                        initial_date = datetime.strptime(due_date_full, "%Y-%m-%d").date()
-                    except ValueError:
-                        pass
+            # Data (já convertida no Task)
+            due_at = task_data.due_at if is_edit else None
+            initial_date = due_at.date() if due_at else None
+            initial_time = due_at.time() if due_at and task_data.has_due_time else None
             
             due_date = st.date_input("Data Limite (Opcional)", value=initial_date)
             
@@ -944,7 +662,7 @@ def task_form():
                 "Prioridade",
                 options=priority_options,
                 format_func=lambda x: priority_labels.get(x, x.capitalize()),
-                index=priority_options.index(task_data.get("priority", "medium")), key="priority_select"
+                index=priority_options.index(task_data.priority if is_edit else "medium"), key="priority_select"
             )
             
         with col4:
@@ -952,7 +670,7 @@ def task_form():
                 "Tipo",
                 options=["single", "daily"],
                 format_func=lambda x: "Única" if x == "single" else "Diária",
-                index=["single", "daily"].index(task_data.get("type", "single"))
+                index=["single", "daily"].index(task_data.type if is_edit else "single")
             )
         
         submit_button = st.form_submit_button("Salvar Tarefa" if is_edit else "Adicionar Tarefa", use_container_width=True)
@@ -976,11 +694,14 @@ def task_form():
             }
             
             if is_edit:
-                update_task(task_data["id"], updates)
-                st.success("Tarefa atualizada com sucesso!")
+                future = update_task_optimistic(task_data.id, st.session_state.current_user["id"], updates)
+                track_write(future, task_data.id, title)
+                st.session_state.get("task_details", {}).pop(task_data.id, None)
+                queue_toast("Tarefa atualizada com sucesso!")
             else:
-                add_task(st.session_state.current_user["id"], **updates)
-                st.success("Tarefa adicionada com sucesso!")
+                task, future = add_task_deferred(st.session_state.current_user["id"], **updates)
+                track_write(future, task.id, title)
+                queue_toast("Tarefa adicionada com sucesso!")
             
             st.session_state.show_task_form = False
             st.session_state.task_to_edit = None
@@ -993,53 +714,128 @@ def task_form():
 
 from tutorial import mostrar_tutorial # Importa a função do tutorial
 
-def filter_and_sort_tasks(tasks):
-    """Aplica filtros e ordenação nas tarefas."""
+def render_task_list(tasks, container_type, has_more=False):
+    """Renderiza apenas uma janela da lista, com botão para carregar mais."""
+    window_key = f"task_window_{container_type}"
+    window = st.session_state.get(window_key, TASK_PAGE_SIZE)
+    
+    selectable = st.session_state.get(f"multi_select_{container_type}", False)
+    for task in tasks[:window]:
+        render_task_card(task, container_type=container_type, selectable=selectable)
+    
+    if has_more or len(tasks) > window:
+        if st.button("Carregar mais", key=f"load_more_{container_type}", use_container_width=True):
+            st.session_state[window_key] = window + TASK_PAGE_SIZE
+            rerun_fragment()
+
+def get_selected_task_ids(container_type):
+    """Ids marcados no modo de seleção múltipla (estado dos checkboxes 'select_')."""
+    prefix = f"select_{container_type}_"
+    return [key[len(prefix):] for key, value in st.session_state.items()
+            if str(key).startswith(prefix) and value]
+
+def clear_task_selection(container_type):
+    prefix = f"select_{container_type}_"
+    for key in [k for k in st.session_state if str(k).startswith(prefix)]:
+        del st.session_state[key]
+
+def require_selection(selected):
+    if not selected:
+        st.warning("Selecione ao menos uma tarefa.")
+    return bool(selected)
+
+def report_bulk_result(changed, selected, message):
+    """Toast com o número de tarefas que o banco realmente alterou."""
+    if changed is None:
+        queue_toast("Erro ao aplicar a ação às tarefas selecionadas.", icon="❌")
+    elif len(changed) < len(selected):
+        queue_toast(f"{len(changed)} de {len(selected)} {message}", icon="⚠️")
+    else:
+        queue_toast(f"{len(changed)} {message}", icon="✅")
+
+def bulk_actions_bar(container_type, completed=False):
+    """Ações em lote: uma única requisição para todas as tarefas selecionadas."""
+    if not st.toggle("Seleção múltipla", key=f"multi_select_{container_type}"):
+        return
     
-    # 1. Filtragem
-    filtered_tasks = tasks
+    # Marcar uma tarefa reexecuta só o card; a seleção é lida no clique
+    selected = get_selected_task_ids(container_type)
     
-    # Filtro por Prioridade
-    if st.session_state.filter_priority != "all":
-        filtered_tasks = [t for t in filtered_tasks if t.get("priority") == st.session_state.filter_priority]
-        
-    # Filtro por Tipo (opcional, usando o que já existe)
-    if st.session_state.filter_type != "all":
-        filtered_tasks = [t for t in filtered_tasks if t.get("type") == st.session_state.filter_type]
-        
-    # 2. Ordenação
-    sort_key = st.session_state.filter_sort
-    
-    if sort_key == "priority":
-        # Prioridade (Alta > Média > Baixa) e Data de Vencimento (mais próxima primeiro)
-        priority_order = {"high": 3, "medium": 2, "low": 1}
-        sorted_tasks = sorted(filtered_tasks, 
-                              key=lambda x: (priority_order.get(x.get("priority", "medium"), 0), x.get("due_date", "9999-12-31")), 
-                              reverse=True)
-    elif sort_key == "creation_date":
-        # Data de Criação (mais antiga primeiro)
-        sorted_tasks = sorted(filtered_tasks, 
-                              key=lambda x: x.get("created_at", "0000-01-01"), 
-                              reverse=False)
-    elif sort_key == "due_date":
-        # Data de Vencimento (mais próxima primeiro)
-        sorted_tasks = sorted(filtered_tasks, 
-                              key=lambda x: x.get("due_date", "9999-12-31"), 
-                              reverse=False)
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+    priority_labels = {"low": "Baixa", "medium": "Média", "high": "Alta"}
+    
+    with col1:
+        label = "Reativar selecionadas" if completed else "Concluir selecionadas"
+        if st.button(label, key=f"bulk_complete_{container_type}", use_container_width=True) and require_selection(selected):
+            updated = bulk_update_tasks(selected, {"completed": not completed})
+            report_bulk_result(updated, selected, f"tarefa(s) {'reativada(s)' if completed else 'concluída(s)'}!")
+            clear_task_selection(container_type)
+            st.rerun()
+    
+    with col2:
+        if st.button("Excluir selecionadas", key=f"bulk_delete_{container_type}", use_container_width=True) and require_selection(selected):
+            deleted = bulk_delete_tasks(selected)
+            report_bulk_result(deleted, selected, "tarefa(s) excluída(s).")
+            clear_task_selection(container_type)
+            st.rerun()
+    
+    with col3:
+        new_priority = st.selectbox(
+            "Nova prioridade",
+            options=list(priority_labels.keys()),
+            format_func=lambda x: priority_labels[x],
+            key=f"bulk_priority_{container_type}",
+            label_visibility="collapsed"
+        )
+    
+    with col4:
+        if st.button("Aplicar", key=f"bulk_apply_priority_{container_type}", use_container_width=True) and require_selection(selected):
+            updated = bulk_update_tasks(selected, {"priority": new_priority})
+            report_bulk_result(updated, selected, "tarefa(s) com a prioridade alterada.")
+            clear_task_selection(container_type)
+            st.rerun()
+
+def load_completed_window(user_id):
+    """Concluídas da janela atual numa única consulta keyset (mais recentes primeiro)."""
+    window = st.session_state.get("task_window_completed", TASK_PAGE_SIZE)
+    filters = get_task_filters()
+    tasks, cursor = get_tasks_page(user_id, completed=True, limit=window,
+                                   priority=filters["priority"], task_type=filters["task_type"])
+    return tasks, cursor is not None
+
+@st.fragment
+def task_list_section(container_type, completed=False, has_tasks=True):
+    """Filtros, ações em lote e lista; mudar um filtro reexecuta só este trecho."""
+    user = st.session_state.current_user
+    
+    # O histórico segue a ordem de conclusão do keyset; ordenar só a parte
+    # carregada faria os cards trocarem de lugar a cada "Carregar mais"
+    task_list_filters(sortable=not completed)
+    
+    if not has_tasks:
+        return
+    
+    if completed:
+        # Aplica filtros (exceto o de conclusão, claro)
+        sorted_tasks, has_more = load_completed_window(user["id"])
     else:
-        # Default: Prioridade
-        priority_order = {"high": 3, "medium": 2, "low": 1}
-        sorted_tasks = sorted(filtered_tasks, 
-                              key=lambda x: (priority_order.get(x.get("priority", "medium"), 0), x.get("due_date", "9999-12-31")), 
-                              reverse=True)
-        
-    return sorted_tasks
+        sorted_tasks, has_more = get_filtered_tasks(user["id"], completed=False, **get_task_filters()), False
+    
+    if sorted_tasks:
+        bulk_actions_bar(container_type, completed=completed)
+        render_task_list(sorted_tasks, container_type=container_type, has_more=has_more)
+    else:
+        label = "concluída" if completed else "pendente"
+        st.info(f"Nenhuma tarefa {label} encontrada com os filtros atuais.")
 
-def task_list_filters():
-    """Renderiza os filtros de lista de tarefas."""
+def task_list_filters(sortable=True):
+    """Renderiza os filtros de lista de tarefas (sem o de ordenação se sortable=False)."""
     st.markdown('<div class="section-title">Filtros de Tarefas</div>', unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns(3)
+    if sortable:
+        col1, col2, col3 = st.columns(3)
+    else:
+        col1, col3 = st.columns(2)
     
     priority_options = {"all": "Todas", "high": "Alta", "medium": "Média", "low": "Baixa"}
     sort_options = {"priority": "Prioridade", "creation_date": "Data de Criação (Antigas Primeiro)", "due_date": "Data de Vencimento (Próximas Primeiro)"}
@@ -1055,19 +851,20 @@ def task_list_filters():
         )
         if selected_priority != st.session_state.filter_priority:
             st.session_state.filter_priority = selected_priority
-            st.rerun()
+            rerun_fragment()
             
-    with col2:
-        selected_sort = st.selectbox(
-            "Ordenar por",
-            options=list(sort_options.keys()),
-            format_func=lambda x: sort_options[x],
-            key="filter_sort_select",
-            index=list(sort_options.keys()).index(st.session_state.filter_sort)
-        )
-        if selected_sort != st.session_state.filter_sort:
-            st.session_state.filter_sort = selected_sort
-            st.rerun()
+    if sortable:
+        with col2:
+            selected_sort = st.selectbox(
+                "Ordenar por",
+                options=list(sort_options.keys()),
+                format_func=lambda x: sort_options[x],
+                key="filter_sort_select",
+                index=list(sort_options.keys()).index(st.session_state.filter_sort)
+            )
+            if selected_sort != st.session_state.filter_sort:
+                st.session_state.filter_sort = selected_sort
+                rerun_fragment()
             
     with col3:
         selected_type = st.selectbox(
@@ -1079,13 +876,12 @@ def task_list_filters():
         )
         if selected_type != st.session_state.filter_type:
             st.session_state.filter_type = selected_type
-            st.rerun()
+            rerun_fragment()
     
     st.markdown("---")
 
+@traced()
 def dashboard_screen():
-    apply_theme_css()
-    
     user = st.session_state.current_user
     
     if st.session_state.show_tutorial:
@@ -1112,87 +908,47 @@ def dashboard_screen():
     
     stats = get_user_stats(user["id"])
     
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown(f'<div class="stats-card"><div class="stats-number">{stats["total"]}</div><div class="stats-label">Total de Tarefas</div></div>', unsafe_allow_html=True)
-    with col2:
-        st.markdown(f'<div class="stats-card"><div class="stats-number">{stats["completed"]}</div><div class="stats-label">Concluídas</div></div>', unsafe_allow_html=True)
-    with col3:
-        st.markdown(f'<div class="stats-card"><div class="stats-number">{stats["pending"]}</div><div class="stats-label">Pendentes</div></div>', unsafe_allow_html=True)
+    stat_cards([("total", "Total de Tarefas"), ("completed", "Concluídas"), ("pending", "Pendentes")])
     
     st.markdown('<div class="section-title">Tarefas Pendentes</div>', unsafe_allow_html=True)
     
-    task_list_filters()
-    
-    pending_tasks = get_pending_tasks(user["id"])
+    task_list_section("dashboard", has_tasks=stats["pending"] > 0)
     
-    if pending_tasks:
-        sorted_tasks = filter_and_sort_tasks(pending_tasks)
-        
-        if sorted_tasks:
-            for task in sorted_tasks:
-                render_task_card(task, container_type="dashboard")
-        else:
-            st.info("Nenhuma tarefa pendente encontrada com os filtros atuais.")
-    else:
+    if not stats["pending"]:
         st.info("Parabéns! Nenhuma tarefa pendente. Que tal adicionar uma nova?")
         if st.button("Adicionar Primeira Tarefa", key="btn_add_first_task"):
             st.session_state.show_task_form = True
             st.rerun()
 
+@traced()
 def pending_tasks_screen():
-    apply_theme_css()
-    
     user = st.session_state.current_user
     
     st.markdown(f'<div class="page-header">Tarefas Pendentes</div>', unsafe_allow_html=True)
     st.markdown(f'<div class="page-subtitle">Foque no que é mais importante.</div>', unsafe_allow_html=True)
     
-    task_list_filters()
+    stats = get_user_stats(user["id"])
     
-    pending_tasks = get_pending_tasks(user["id"])
+    task_list_section("pending", has_tasks=stats["pending"] > 0)
     
-    if pending_tasks:
-        sorted_tasks = filter_and_sort_tasks(pending_tasks)
-        
-        if sorted_tasks:
-            for task in sorted_tasks:
-                render_task_card(task, container_type="pending")
-        else:
-            st.info("Nenhuma tarefa pendente encontrada com os filtros atuais.")
-    else:
+    if not stats["pending"]:
         st.info("Nenhuma tarefa pendente. Ótimo trabalho!")
         if st.button("Voltar ao Início"):
             st.session_state.current_screen = "dashboard"
             st.rerun()
 
+@traced()
 def completed_tasks_screen():
-    apply_theme_css()
-    
     user = st.session_state.current_user
     
     st.markdown(f'<div class="page-header">Tarefas Concluídas</div>', unsafe_allow_html=True)
     st.markdown(f'<div class="page-subtitle">Seu histórico de sucesso.</div>', unsafe_allow_html=True)
     
-    task_list_filters()
+    stats = get_user_stats(user["id"])
     
-    # Importa a função get_completed_tasks do utils.py
-    from utils import get_completed_tasks
-    completed_tasks = get_completed_tasks(user["id"])
+    task_list_section("completed", completed=True, has_tasks=stats["completed"] > 0)
     
-    if completed_tasks:
-        # Ordena as concluídas por data de conclusão (mais recente primeiro)
-        sorted_tasks = sorted(completed_tasks, key=lambda x: x.get("updated_at", "0000-01-01"), reverse=True)
-        
-        # Aplica filtros (exceto o de conclusão, claro)
-        sorted_tasks = filter_and_sort_tasks(sorted_tasks)
-        
-        if sorted_tasks:
-            for task in sorted_tasks:
-                render_task_card(task, container_type="completed")
-        else:
-            st.info("Nenhuma tarefa concluída encontrada com os filtros atuais.")
-    else:
+    if not stats["completed"]:
         st.info("Nenhuma tarefa concluída ainda. Comece a riscar a lista!")
         if st.button("Voltar ao Início"):
             st.session_state.current_screen = "dashboard"
@@ -1220,6 +976,14 @@ def main():
         </script>
     """, unsafe_allow_html=True)
     init_session_state()
+    restore_session()
+    start_reminders()
+    
+    # Contadores e CSS do tema valem apenas para este rerun
+    st.session_state.task_stats = None
+    st.session_state.theme_css_applied = False
+    process_pending_writes()
+    flush_toasts()
     
     if st.session_state.current_user is None:
         if 'current_theme' not in st.session_state:
@@ -1231,6 +995,7 @@ def main():
         elif st.session_state.current_screen == "register":
             tela_registro()
     else:
+        sync_session_token()
         apply_theme_css()
         mostrar_menu_lateral()
         
@@ -1246,4 +1011,12 @@ def main():
             dashboard_screen()
 
 if __name__ == "__main__":
-    main()
+    tracing.begin_run(st.session_state.get("current_screen", "login"))
+    try:
+        main()
+    finally:
+        # Também roda quando st.rerun() interrompe o script
+        trace = tracing.end_run()
+        if trace is not None:
+            st.session_state.last_trace = trace
+            tracing.check_budget(trace)
@@ -0,0 +1,246 @@
+"""
+NeuroTask - Benchmark de reruns
+Mede dashboard, pendentes e concluídas com o AppTest do Streamlit contra um
+banco SQLite local, variando a quantidade de tarefas por usuário, e a troca
+de filtros/ordenação na tela de pendentes (pending_filters: cada "rerun" é
+uma troca, que deve sair do TaskIndex sem ir ao banco).
+
+Uso:
+    python benchmarks/bench_reruns.py
+    python benchmarks/bench_reruns.py --sizes 10,1000 --runs 30 --db /tmp/bench.db
+
+Cada execução acrescenta uma linha por (tamanho, tela) em
+benchmarks/results/rerun_latency.jsonl e mostra a variação do p50 em relação
+à última medição registrada.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_FILE = Path(__file__).resolve().parent / "results" / "rerun_latency.jsonl"
+
+# Antes de importar utils, para não abrir conexão com o Supabase
+os.environ.setdefault("NEUROTASK_STORAGE", "sqlite")
+os.environ.setdefault("NEUROTASK_SQLITE_PATH", ":memory:")
+# Sem a thread de lembretes, que faria consultas fora das execuções medidas
+os.environ.setdefault("NEUROTASK_REMINDERS", "0")
+sys.path.insert(0, str(ROOT))
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+import utils
+from storage import SQLiteStore, TaskStore
+
+SCREENS = ("dashboard", "pending_tasks", "completed_tasks")
+# Trocas feitas em sequência na tela de pendentes (chave do selectbox, valor)
+FILTER_SWITCHES = [("filter_sort_select", "due_date"), ("filter_priority_select", "high"),
+                   ("filter_type_select", "daily"), ("filter_sort_select", "creation_date"),
+                   ("filter_priority_select", "all"), ("filter_type_select", "all"),
+                   ("filter_sort_select", "priority")]
+WIDGET_TYPES = ("button", "checkbox", "toggle", "selectbox", "text_input", "text_area",
+                "date_input", "time_input", "radio", "multiselect", "number_input", "slider")
+
+class CountingStore(TaskStore):
+    """Repassa as chamadas para outro backend contando cada uma delas"""
+
+    def __init__(self, inner: TaskStore):
+        self.inner = inner
+        self.calls = Counter()
+
+    def __getattribute__(self, name):
+        if name.startswith("_") or name in ("inner", "calls", "total"):
+            return object.__getattribute__(self, name)
+        method = getattr(self.inner, name)
+        calls = self.calls
+
+        def counted(*args, **kwargs):
+            calls[name] += 1
+            return method(*args, **kwargs)
+        return counted
+
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+def seed_tasks(store: TaskStore, user_id: str, count: int) -> None:
+    """Tarefas variadas: ~30% concluídas, prioridades, tipos e vencimentos misturados"""
+    rng = random.Random(count)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        created = (start + timedelta(minutes=i)).isoformat()
+        due = start + timedelta(days=rng.randint(0, 90))
+        rows.append({
+            "user_id": user_id,
+            "title": f"Tarefa {i}",
+            "description": "",
+            "due_date": rng.choice(["", due.strftime("%Y-%m-%d"), due.strftime("%Y-%m-%d %H:%M")]),
+            "type": rng.choice(["single", "daily"]),
+            "priority": rng.choice(["high", "medium", "low"]),
+            "completed": rng.random() < 0.3,
+            "created_at": created,
+            "updated_at": created
+        })
+    for i in range(0, len(rows), 500):
+        store.insert_tasks(rows[i:i + 500])
+
+def widget_count(at: AppTest) -> int:
+    return sum(len(getattr(at, name)) for name in WIDGET_TYPES)
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+def measure_screen(store: CountingStore, user: dict, screen: str, runs: int) -> dict:
+    # Cada tela começa com o cache do processo vazio: a primeira execução é a "fria"
+    utils.invalidate_task_cache()
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+    # O AppTest roda fora de um servidor; o aviso de contexto ausente só polui a tabela
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    at.session_state.current_user = user
+    at.session_state.current_screen = screen
+
+    store.calls.clear()
+    started = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - started) * 1000
+    cold_calls = store.total()
+    if at.exception:
+        raise RuntimeError(f"{screen}: {at.exception[0].message}")
+
+    timings, calls = [], []
+    for _ in range(runs):
+        store.calls.clear()
+        started = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - started) * 1000)
+        calls.append(store.total())
+
+    return {
+        "screen": screen,
+        "cold_ms": round(cold_ms, 2),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "db_calls_cold": cold_calls,
+        "db_calls_per_rerun": round(statistics.mean(calls), 2),
+        "widgets": widget_count(at)
+    }
+
+def measure_filter_switches(store: CountingStore, user: dict, runs: int) -> dict:
+    """Pending screen rerun after each filter/sort change; the cold run is the first load"""
+    utils.invalidate_task_cache()
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    at.session_state.current_user = user
+    at.session_state.current_screen = "pending_tasks"
+
+    store.calls.clear()
+    started = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - started) * 1000
+    cold_calls = store.total()
+
+    timings, calls = [], []
+    for i in range(runs):
+        key, value = FILTER_SWITCHES[i % len(FILTER_SWITCHES)]
+        store.calls.clear()
+        started = time.perf_counter()
+        at.selectbox(key=key).set_value(value).run()
+        timings.append((time.perf_counter() - started) * 1000)
+        calls.append(store.total())
+        if at.exception:
+            raise RuntimeError(f"pending_filters: {at.exception[0].message}")
+
+    return {
+        "screen": "pending_filters",
+        "cold_ms": round(cold_ms, 2),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "db_calls_cold": cold_calls,
+        "db_calls_per_rerun": round(statistics.mean(calls), 2),
+        "widgets": widget_count(at)
+    }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def load_previous() -> dict:
+    """Última medição registrada por (tamanho, tela)"""
+    previous = {}
+    if RESULTS_FILE.exists():
+        for line in RESULTS_FILE.read_text().splitlines():
+            if line.strip():
+                record = json.loads(line)
+                previous[(record["tasks"], record["screen"])] = record
+    return previous
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reruns do NeuroTask")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="quantidades de tarefas, separadas por vírgula")
+    parser.add_argument("--runs", type=int, default=20, help="reruns medidos por tela")
+    parser.add_argument("--db", default=":memory:", help="arquivo SQLite (padrão: em memória)")
+    parser.add_argument("--no-save", action="store_true", help="não gravar em results/")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    previous = load_previous()
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "runs": args.runs
+    }
+
+    records = []
+    print(f"{'tarefas':>8} {'tela':<16} {'fria ms':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'db fria':>8} {'db/rerun':>9} {'widgets':>8} {'Δp50':>7}")
+    for size in sizes:
+        if args.db != ":memory:" and os.path.exists(args.db):
+            os.remove(args.db)
+        store = CountingStore(SQLiteStore(args.db))
+        utils.store = store
+        user = store.insert_user({"username": f"bench{size}", "email": f"bench{size}@example.com",
+                                  "password": "-", "theme_settings": {"current_theme": "light_lavender"}})
+        seed_tasks(store, user["id"], size)
+
+        for screen in (*SCREENS, "pending_filters"):
+            if screen == "pending_filters":
+                result = measure_filter_switches(store, user, args.runs)
+            else:
+                result = measure_screen(store, user, screen, args.runs)
+            record = {**meta, "tasks": size, **result}
+            records.append(record)
+
+            before = previous.get((size, screen))
+            delta = f"{(result['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}%" if before else "-"
+            print(f"{size:>8} {screen:<16} {result['cold_ms']:>9.1f} {result['p50_ms']:>8.1f} "
+                  f"{result['p95_ms']:>8.1f} {result['db_calls_cold']:>8} {result['db_calls_per_rerun']:>9} "
+                  f"{result['widgets']:>8} {delta:>7}")
+
+    if not args.no_save:
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with RESULTS_FILE.open("a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        print(f"\nResultados gravados em {RESULTS_FILE.relative_to(ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+NeuroTask - Migração de senhas legadas
+Percorre a tabela users em páginas e troca hashes SHA256 e senhas em texto
+puro por bcrypt, sem precisar que o usuário faça login.
+
+Uso:
+    python migrate_passwords.py --dry-run
+    python migrate_passwords.py --page-size 1000 --batch-size 200 --workers 4
+
+Senhas em texto puro viram bcrypt(senha). Hashes SHA256 não revelam a senha,
+então viram "sha256$" + bcrypt(hash SHA256); verify_password aceita esse
+formato e o próximo login troca por um bcrypt comum. Cada troca só é gravada
+se o hash no banco ainda for o lido, então rodar de novo (ou junto com logins)
+é seguro.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import utils
+
+def _upgrade(item: tuple) -> tuple:
+    user_id, old_hash, rounds = item
+    return user_id, old_hash, utils.upgrade_legacy_hash(old_hash, rounds)
+
+def iter_legacy_credentials(store, page_size: int):
+    """Pages of (user_id, hash) pairs still using SHA256 or plaintext"""
+    after_id = None
+    while True:
+        rows = store.page_user_credentials(after_id, page_size)
+        if not rows:
+            return
+        after_id = rows[-1]["id"]
+        yield len(rows), [(row["id"], row["password"]) for row in rows
+                          if row.get("password") and not utils.is_bcrypt_hash(row["password"])
+                          and not row["password"].startswith(utils.SHA256_BCRYPT_PREFIX)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra senhas SHA256/texto puro para bcrypt")
+    parser.add_argument("--page-size", type=int, default=500, help="usuários lidos por consulta")
+    parser.add_argument("--batch-size", type=int, default=100, help="senhas gravadas por escrita")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos para o bcrypt")
+    parser.add_argument("--rounds", type=int, default=0, help="custo do bcrypt (padrão: o mesmo do app)")
+    parser.add_argument("--dry-run", action="store_true", help="só conta as senhas legadas")
+    args = parser.parse_args()
+
+    if not utils.store:
+        raise SystemExit("Banco de dados não disponível")
+    rounds = args.rounds or utils.bcrypt_rounds()
+    started = time.perf_counter()
+    scanned = legacy = updated = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for page_rows, credentials in iter_legacy_credentials(utils.store, args.page_size):
+            scanned += page_rows
+            legacy += len(credentials)
+            if args.dry_run or not credentials:
+                continue
+            jobs = [(user_id, old_hash, rounds) for user_id, old_hash in credentials]
+            changes = list(pool.map(_upgrade, jobs, chunksize=max(1, len(jobs) // (args.workers * 4))))
+            for i in range(0, len(changes), args.batch_size):
+                updated += utils.store.replace_passwords(changes[i:i + args.batch_size])
+            print(f"{scanned} usuários lidos, {legacy} senhas legadas, {updated} migradas")
+
+    elapsed = time.perf_counter() - started
+    if args.dry_run:
+        print(f"{legacy} de {scanned} usuários com senha legada ({elapsed:.1f}s)")
+    else:
+        print(f"Concluído: {updated} de {legacy} senhas legadas migradas (custo {rounds}, {elapsed:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+NeuroTask - Models
+Modelo de tarefa montado uma única vez quando a linha sai do banco
+"""
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timezone
+
+PRIORITY_RANK = {"high": 3, "medium": 2, "low": 1}
+
+# Chaves de ordenação para campos vazios (sem data fica antes, como a string vazia no banco)
+_NO_DUE_DATE = datetime.min
+_NO_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc)
+
+def parse_due_date(value: str):
+    """Parse 'YYYY-MM-DD HH:MM' or 'YYYY-MM-DD'; None if empty or invalid"""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+def parse_timestamp(value: str):
+    """Parse an ISO timestamp from the database (sempre com fuso)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    """Uma tarefa com as datas já convertidas e os textos de exibição prontos.
+
+    Os campos derivados são calculados no __post_init__, então replace()/merge()
+    os mantém coerentes com as colunas.
+    """
+    id: str
+    user_id: str
+    title: str = ""
+    due_date: str = ""
+    type: str = "single"
+    priority: str = "medium"
+    completed: bool = False
+    created_at: str = ""
+    updated_at: str = ""
+    description: str = None  # só vem nas consultas de detalhe
+
+    due_at: datetime = field(init=False, repr=False, compare=False)
+    created: datetime = field(init=False, repr=False, compare=False)
+    priority_rank: int = field(init=False, repr=False, compare=False)
+    priority_sort_key: tuple = field(init=False, repr=False, compare=False)
+    due_label: str = field(init=False, repr=False, compare=False)
+    created_label: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        due_at = parse_due_date(self.due_date)
+        created = parse_timestamp(self.created_at)
+        if due_at is None:
+            due_label = self.due_date or ""
+        elif self.has_due_time:
+            due_label = due_at.strftime("%d/%m/%Y %H:%M")
+        else:
+            due_label = due_at.strftime("%d/%m/%Y")
+        set_field = object.__setattr__
+        set_field(self, "due_at", due_at)
+        set_field(self, "created", created)
+        set_field(self, "priority_rank", PRIORITY_RANK.get(self.priority, 0))
+        # Prioridade e vencimento decrescentes como uma chave crescente (para bisect)
+        due = due_at or _NO_DUE_DATE
+        set_field(self, "priority_sort_key",
+                  (-self.priority_rank, -(due.toordinal() * 1440 + due.hour * 60 + due.minute)))
+        set_field(self, "due_label", due_label)
+        set_field(self, "created_label", created.strftime("%d/%m/%Y") if created else "")
+
+    @property
+    def has_due_time(self) -> bool:
+        return len(self.due_date or "") > 10
+
+    @property
+    def due_sort_key(self) -> datetime:
+        return self.due_at or _NO_DUE_DATE
+
+    @property
+    def created_sort_key(self) -> datetime:
+        return self.created or _NO_TIMESTAMP
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Task":
+        """Build a Task from a database row (colunas desconhecidas são ignoradas)"""
+        return cls(
+            id=row["id"],
+            user_id=row.get("user_id"),
+            title=row.get("title") or "",
+            due_date=row.get("due_date") or "",
+            type=row.get("type") or "single",
+            priority=row.get("priority") or "medium",
+            completed=bool(row.get("completed", False)),
+            created_at=row.get("created_at") or "",
+            updated_at=row.get("updated_at") or "",
+            description=row.get("description")
+        )
+
+    def to_row(self) -> dict:
+        """Column values only, without the derived fields"""
+        return {name: getattr(self, name) for name in TASK_COLUMNS}
+
+    def merge(self, updates: dict) -> "Task":
+        """Return a copy with column updates applied"""
+        return replace(self, **{k: v for k, v in updates.items() if k in TASK_COLUMNS})
+
+TASK_COLUMNS = tuple(f.name for f in fields(Task) if f.init)
@@ -0,0 +1,172 @@
+"""
+NeuroTask - Reminders
+Agendador de lembretes do processo: uma min-heap com os vencimentos das
+próximas horas, de todos os usuários, e uma única thread que dorme até o
+próximo e chama o callback de notificação.
+
+A heap é carregada do banco em janelas (REMINDER_HORIZON) e mantida em dia
+pelas mutações de tarefas feitas pelo app (schedule/unschedule, chamados
+pelo cache em utils). Entradas antigas não são removidas da heap: cada uma
+só dispara se ainda for a versão atual da tarefa.
+
+Só tarefas pendentes com horário ("YYYY-MM-DD HH:MM") geram lembrete.
+
+Cada processo do app tem o seu agendador; antes de notificar, o lembrete é
+reivindicado no banco (store.claim_reminder, um UPDATE condicional em
+tasks.notified_at) e só o processo que ganhou envia.
+"""
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+
+from models import Task
+
+REMINDER_HORIZON = timedelta(hours=6)
+REFILL_RETRY = timedelta(minutes=1)
+DUE_FORMAT = "%Y-%m-%d %H:%M"
+
+class ReminderScheduler:
+    """Dispara notify(task) quando o vencimento de uma tarefa chega"""
+
+    def __init__(self, store, notify, horizon: timedelta = REMINDER_HORIZON, clock=datetime.now):
+        self.store = store
+        self.notify = notify
+        self.horizon = horizon
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._heap = []  # (vencimento, sequência, tarefa)
+        self._current = {}  # task_id -> tarefa agendada (as demais entradas da heap são velhas)
+        self._seq = itertools.count()
+        self._loaded_until = None  # fim da janela já lida do banco
+        self._refill_until = None  # fim da janela sendo lida agora
+        self._touched = None  # tarefas alteradas durante a leitura (valem mais que ela)
+        self._thread = None
+        self._stopped = False
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="neurotask-reminders", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    # =============================
+    # Mutações
+    # =============================
+    @staticmethod
+    def _has_reminder(task: Task) -> bool:
+        return not task.completed and task.has_due_time and task.due_at is not None
+
+    def _in_window(self, task: Task) -> bool:
+        # Além da janela carregada: a próxima leitura do banco traz a tarefa
+        window_end = max(filter(None, (self._loaded_until, self._refill_until)), default=None)
+        if window_end is None or task.due_at >= window_end:
+            return False
+        # Vencimentos que já passaram não disparam lembrete
+        return task.due_at >= self.clock().replace(second=0, microsecond=0)
+
+    def schedule(self, task: Task) -> None:
+        """Add, move or drop a task's reminder after it changed"""
+        with self._cond:
+            if self._touched is not None:
+                self._touched.add(task.id)
+            if not self._has_reminder(task) or not self._in_window(task):
+                self._current.pop(task.id, None)
+                return
+            # A entrada anterior fica na heap, mas deixa de ser a atual
+            self._current[task.id] = task
+            heapq.heappush(self._heap, (task.due_at, next(self._seq), task))
+            self._cond.notify()
+
+    def unschedule(self, task_id: str) -> None:
+        with self._cond:
+            if self._touched is not None:
+                self._touched.add(task_id)
+            self._current.pop(task_id, None)
+
+    def unschedule_user(self, user_id: str) -> None:
+        with self._cond:
+            for task_id in [t.id for t in self._current.values() if t.user_id == user_id]:
+                del self._current[task_id]
+
+    def pending(self) -> list:
+        """Scheduled tasks, soonest first"""
+        with self._cond:
+            return sorted(self._current.values(), key=lambda t: t.due_at)
+
+    # =============================
+    # Worker
+    # =============================
+    def _refill(self, now: datetime) -> None:
+        # Lê a próxima janela fora do lock; mutações feitas nesse meio tempo
+        # valem mais que a leitura e não são sobrescritas
+        start = self._loaded_until or now.replace(second=0, microsecond=0)
+        end = (now + self.horizon).replace(second=0, microsecond=0)
+        with self._cond:
+            self._refill_until = end
+            self._touched = set()
+        try:
+            rows = self.store.upcoming_due_tasks(start.strftime(DUE_FORMAT), end.strftime(DUE_FORMAT))
+        except Exception:
+            with self._cond:
+                self._refill_until = self._touched = None
+            raise
+        with self._cond:
+            for row in rows:
+                task = Task.from_row(row)
+                if task.id in self._touched or task.id in self._current or not self._has_reminder(task):
+                    continue
+                self._current[task.id] = task
+                heapq.heappush(self._heap, (task.due_at, next(self._seq), task))
+            self._loaded_until = end
+            self._refill_until = self._touched = None
+
+    def _pop_due(self, now: datetime) -> list:
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, task = heapq.heappop(self._heap)
+            if self._current.get(task.id) is task:
+                del self._current[task.id]
+                fired.append(task)
+        return fired
+
+    def _run(self) -> None:
+        retry_at = None
+        while True:
+            now = self.clock()
+            needs_refill = self._loaded_until is None or self._loaded_until - now < self.horizon / 2
+            if needs_refill and (retry_at is None or now >= retry_at):
+                try:
+                    self._refill(now)
+                    retry_at = None
+                except Exception as e:
+                    print(f"Erro ao carregar lembretes: {e}")
+                    retry_at = now + REFILL_RETRY
+            with self._cond:
+                if self._stopped:
+                    return
+                fired = self._pop_due(now)
+            for task in fired:
+                try:
+                    if self.store.claim_reminder(task.id, task.due_date):
+                        self.notify(task)
+                except Exception as e:
+                    print(f"Erro ao enviar lembrete: {e}")
+            with self._cond:
+                if self._stopped:
+                    return
+                if fired:
+                    continue
+                # Dorme até o próximo vencimento ou até a hora de ler a próxima janela
+                wake_at = retry_at or self._loaded_until - self.horizon / 2
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+                timeout = (wake_at - self.clock()).total_seconds()
+                if timeout > 0:
+                    self._cond.wait(timeout)
@@ -0,0 +1,75 @@
+"""
+NeuroTask - Session Tokens
+Tokens de sessão assinados com HMAC-SHA256, guardados na URL (?session=...).
+Um reload da página restaura o usuário e o tema conferindo a assinatura e o
+session_epoch do usuário (uma leitura por chave primária, sem bcrypt). Logout
+e exclusão da conta trocam o epoch e revogam todos os tokens emitidos.
+
+Formato: base64url(payload JSON) "." base64url(HMAC do payload)
+
+NEUROTASK_SESSION_SECRET precisa ser o mesmo em todos os processos; sem ele
+a retomada de sessão fica desativada (enabled() é False).
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+TOKEN_PARAM = "session"
+SESSION_TTL_SECONDS = int(os.getenv("NEUROTASK_SESSION_DAYS", "1")) * 86400
+
+# Campos do usuário que vão no token (os mesmos de storage.USER_PUBLIC_COLUMNS, menos o tema)
+_USER_FIELDS = ("id", "username", "email", "created_at")
+
+_secret = os.getenv("NEUROTASK_SESSION_SECRET")
+if not _secret:
+    print("✗ NEUROTASK_SESSION_SECRET não definido: retomada de sessão desativada")
+_SECRET = _secret.encode("utf-8") if _secret else None
+
+def enabled() -> bool:
+    return _SECRET is not None
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _sign(payload: str) -> str:
+    if _SECRET is None:
+        raise RuntimeError("NEUROTASK_SESSION_SECRET não definido")
+    return _b64encode(hmac.new(_SECRET, payload.encode("ascii"), hashlib.sha256).digest())
+
+def issue_token(user: dict, theme: str, now: float = None) -> str:
+    """Signed token for a logged-in user and their current theme"""
+    claims = {
+        "user": {field: user.get(field) for field in _USER_FIELDS},
+        "theme": theme,
+        "epoch": user.get("session_epoch") or 0,
+        "exp": int((now or time.time()) + SESSION_TTL_SECONDS)
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+def read_token(token: str, now: float = None) -> tuple:
+    """(user, theme) from a valid token; None if tampered, malformed or expired.
+
+    O chamador ainda confere user["session_epoch"] com o do banco.
+    """
+    if not enabled() or not token or token.count(".") != 1:
+        return None
+    payload, signature = token.split(".")
+    try:
+        if not hmac.compare_digest(_sign(payload), signature):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeError):
+        return None
+    if claims.get("exp", 0) < (now or time.time()):
+        return None
+    user = dict(claims["user"])
+    user["theme_settings"] = {"current_theme": claims.get("theme")}
+    user["session_epoch"] = claims.get("epoch", 0)
+    return user, claims.get("theme")
@@ -0,0 +1,22 @@
+-- NeuroTask - exclusão de conta em lotes
+-- Usado por utils.start_account_deletion: cada chamada apaga no máximo
+-- p_limit tarefas do usuário e devolve quantas apagou (0 quando terminou),
+-- então nenhuma transação segura a tabela por muito tempo e repetir é seguro.
+
+create or replace function public.purge_user_tasks(p_user_id uuid, p_limit integer)
+returns integer
+language sql
+as $$
+    with doomed as (
+        select id from public.tasks
+        where user_id = p_user_id
+        limit p_limit
+    ),
+    deleted as (
+        delete from public.tasks t
+        using doomed
+        where t.id = doomed.id
+        returning 1
+    )
+    select count(*)::integer from deleted;
+$$;
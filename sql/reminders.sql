@@ -0,0 +1,12 @@
+-- NeuroTask - índice para o agendador de lembretes
+-- reminders.ReminderScheduler lê, de todos os usuários, as tarefas pendentes
+-- com vencimento na próxima janela: due_date >= início and due_date < fim.
+
+create index if not exists tasks_pending_due_date_idx
+    on public.tasks (due_date)
+    where not completed;
+
+-- Um agendador por processo: o lembrete só é enviado por quem o reivindica
+-- (UPDATE ... set notified_at = due_date where notified_at is distinct from
+-- due_date, ver storage.claim_reminder). Mudar o vencimento libera um novo envio.
+alter table public.tasks add column if not exists notified_at text;
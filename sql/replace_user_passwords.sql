@@ -0,0 +1,21 @@
+-- NeuroTask - troca de hashes de senha em lote
+-- Usado por migrate_passwords.py: recebe [{id, old_hash, new_hash}, ...] e só
+-- altera a linha se o hash ainda for old_hash (um login pode ter migrado antes).
+-- Devolve quantas senhas foram trocadas.
+
+create or replace function public.replace_user_passwords(p_changes jsonb)
+returns integer
+language sql
+as $$
+    with changes as (
+        select * from jsonb_to_recordset(p_changes) as c(id uuid, old_hash text, new_hash text)
+    ),
+    updated as (
+        update public.users u
+        set password = c.new_hash
+        from changes c
+        where u.id = c.id and u.password = c.old_hash
+        returning 1
+    )
+    select count(*)::integer from updated;
+$$;
@@ -0,0 +1,6 @@
+-- NeuroTask - revogação de tokens de sessão
+-- O token na URL (session_tokens.py) carrega o session_epoch do usuário; a
+-- restauração confere o valor atual e o logout/exclusão da conta o trocam,
+-- invalidando todos os tokens já emitidos (ver storage.revoke_sessions).
+
+alter table public.users add column if not exists session_epoch bigint not null default 0;
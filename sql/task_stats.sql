@@ -0,0 +1,30 @@
+-- NeuroTask - contadores de tarefas calculados no banco
+-- Usado por utils.get_task_stats: devolve uma única linha, independente
+-- de quantas tarefas o usuário tenha.
+
+create or replace function public.task_stats(p_user_id uuid)
+returns table (
+    total bigint,
+    completed bigint,
+    high bigint,
+    medium bigint,
+    low bigint,
+    daily bigint,
+    single bigint
+)
+language sql
+stable
+as $$
+    select
+        count(*),
+        count(*) filter (where completed),
+        count(*) filter (where priority = 'high'),
+        count(*) filter (where coalesce(priority, 'medium') = 'medium'),
+        count(*) filter (where priority = 'low'),
+        count(*) filter (where type = 'daily'),
+        count(*) filter (where type = 'single')
+    from public.tasks
+    where user_id = p_user_id;
+$$;
+
+create index if not exists tasks_user_id_idx on public.tasks (user_id);
@@ -0,0 +1,6 @@
+-- NeuroTask - unicidade de email e nome de usuário garantida pelo banco
+-- O cadastro faz um único INSERT e traduz a violação (23505) em
+-- "Email já cadastrado" / "Nome de usuário já em uso" (ver storage.insert_user).
+
+create unique index if not exists users_email_key on public.users (email);
+create unique index if not exists users_username_key on public.users (username);
@@ -0,0 +1,591 @@
+"""
+NeuroTask - Storage
+Repositório de usuários e tarefas com duas implementações: Supabase (padrão)
+e SQLite local, escolhidas pela variável NEUROTASK_STORAGE
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Colunas por caso de uso, em vez de select("*")
+USER_PUBLIC_COLUMNS = "id, username, email, theme_settings, created_at"
+USER_AUTH_COLUMNS = USER_PUBLIC_COLUMNS + ", password"
+TASK_LIST_COLUMNS = "id, user_id, title, due_date, type, priority, completed, created_at, updated_at"
+TASK_DETAIL_COLUMNS = TASK_LIST_COLUMNS + ", description"
+
+SQLITE_PATH = "neurotask.db"
+
+# Colunas de ordenação da listagem (ver utils.SORT_KEYS)
+_SORT_ORDERS = {
+    "creation_date": ("created_at", False),
+    "due_date": ("due_date", False),
+    # Prioridade é texto; o banco ordena por vencimento e o ranking é aplicado depois
+    "priority": ("due_date", True)
+}
+
+class DuplicateUserError(Exception):
+    """Insert rejected by a unique constraint; field é 'email' ou 'username'"""
+
+    def __init__(self, field: str):
+        super().__init__(f"{field} já cadastrado")
+        self.field = field
+
+def _duplicate_field(message: str) -> str:
+    # users_email_key / "Key (email)=..." no Postgres, "users.email" no SQLite
+    return "username" if "username" in message else "email"
+
+def _columns(columns: str) -> list:
+    return [c.strip() for c in columns.split(",")]
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _new_epoch() -> int:
+    # Basta ser diferente do anterior; o relógio em microssegundos dispensa ler e incrementar
+    return time.time_ns() // 1000
+
+# =============================
+# Repository Interface
+# =============================
+class TaskStore:
+    """Operações de dados usadas por utils; cada backend devolve linhas como dict.
+
+    Os métodos levantam a exceção do driver em caso de erro; cache, fila de
+    escrita e mensagens ficam em utils.
+    """
+
+    # Usuários
+    def insert_user(self, data: dict) -> dict:
+        """Insert a user; DuplicateUserError if the email or username exists"""
+        raise NotImplementedError
+
+    def find_user(self, field: str, value: str, with_password: bool = False) -> dict:
+        """User by 'email' or 'username' (o hash da senha só se pedido)"""
+        raise NotImplementedError
+
+    def update_user(self, email: str, updates: dict) -> dict:
+        raise NotImplementedError
+
+    def delete_user(self, email: str) -> None:
+        raise NotImplementedError
+
+    def session_epoch(self, user_id: str) -> int:
+        """Current session epoch of a user, or None if the user doesn't exist"""
+        raise NotImplementedError
+
+    def revoke_sessions(self, user_id: str) -> int:
+        """Move the user to a new session epoch (tokens antigos deixam de valer)"""
+        raise NotImplementedError
+
+    def page_user_credentials(self, after_id: str, limit: int) -> list:
+        """id, email and password of users after after_id, ordered by id (manutenção)"""
+        raise NotImplementedError
+
+    def replace_passwords(self, changes: list) -> int:
+        """Apply (user_id, old_hash, new_hash) changes where the hash is still old_hash"""
+        raise NotImplementedError
+
+    # Tarefas
+    def list_tasks(self, user_id: str) -> list:
+        raise NotImplementedError
+
+    def get_task(self, task_id: str) -> dict:
+        raise NotImplementedError
+
+    def query_tasks(self, user_id: str, completed: bool, priority: str = "all",
+                    task_type: str = "all", sort: str = "priority") -> list:
+        """Filtered list for one view, ordered by the sort's database column"""
+        raise NotImplementedError
+
+    def page_tasks(self, user_id: str, completed: bool, column: str, cursor: tuple, limit: int,
+                   priority: str = "all", task_type: str = "all") -> list:
+        """Keyset page ordered by (column, id) descending, after the cursor"""
+        raise NotImplementedError
+
+    def due_tasks(self, user_id: str, due_date: str) -> list:
+        raise NotImplementedError
+
+    def upcoming_due_tasks(self, start: str, end: str) -> list:
+        """Pending tasks of every user with start <= due_date < end ('YYYY-MM-DD HH:MM')"""
+        raise NotImplementedError
+
+    def claim_reminder(self, task_id: str, due_date: str) -> bool:
+        """Mark the reminder for due_date as sent; False if another process already did.
+
+        Só reivindica se a tarefa ainda está pendente com esse vencimento.
+        """
+        raise NotImplementedError
+
+    def insert_tasks(self, rows: list) -> list:
+        raise NotImplementedError
+
+    def update_tasks(self, task_ids: list, updates: dict) -> list:
+        raise NotImplementedError
+
+    def delete_tasks(self, task_ids: list) -> list:
+        """Delete tasks; returns the deleted rows (id e user_id)"""
+        raise NotImplementedError
+
+    def delete_user_tasks(self, user_id: str, limit: int) -> int:
+        """Delete at most limit of the user's tasks; returns how many were deleted"""
+        raise NotImplementedError
+
+    # Contadores
+    def count_tasks(self, user_id: str, **filters) -> int:
+        raise NotImplementedError
+
+    def task_stats(self, user_id: str) -> dict:
+        """total/completed/high/medium/low/daily/single in one round trip, or None"""
+        return None
+
+    def ping(self) -> bool:
+        raise NotImplementedError
+
+# =============================
+# Supabase Backend
+# =============================
+class SupabaseStore(TaskStore):
+    """Backend Supabase; connect() devolve o cliente e só é chamada na primeira consulta"""
+
+    def __init__(self, connect):
+        self._connect = connect
+
+    @property
+    def client(self):
+        # supabase_client.get_supabase guarda o cliente do processo; falhas tentam de novo na próxima consulta
+        return self._connect()
+
+    def _filtered(self, query, priority: str, task_type: str):
+        if priority != "all":
+            query = query.eq("priority", priority)
+        if task_type != "all":
+            query = query.eq("type", task_type)
+        return query
+
+    def insert_user(self, data: dict) -> dict:
+        # Unicidade garantida pelo banco (ver sql/users_unique.sql)
+        try:
+            result = self.client.table("users").insert(data).execute()
+        except Exception as e:
+            if getattr(e, "code", None) == "23505":
+                raise DuplicateUserError(_duplicate_field(f"{e.message} {e.details}")) from e
+            raise
+        return result.data[0] if result.data else None
+
+    def find_user(self, field: str, value: str, with_password: bool = False) -> dict:
+        columns = USER_AUTH_COLUMNS if with_password else USER_PUBLIC_COLUMNS
+        result = self.client.table("users").select(columns).eq(field, value).execute()
+        return result.data[0] if result.data else None
+
+    def update_user(self, email: str, updates: dict) -> dict:
+        result = self.client.table("users").update(updates).eq("email", email).execute()
+        return result.data[0] if result.data else None
+
+    def delete_user(self, email: str) -> None:
+        self.client.table("users").delete().eq("email", email).execute()
+
+    def session_epoch(self, user_id: str) -> int:
+        result = self.client.table("users").select("session_epoch").eq("id", user_id).execute()
+        return result.data[0]["session_epoch"] if result.data else None
+
+    def revoke_sessions(self, user_id: str) -> int:
+        epoch = _new_epoch()
+        self.client.table("users").update({"session_epoch": epoch}).eq("id", user_id).execute()
+        return epoch
+
+    def page_user_credentials(self, after_id: str, limit: int) -> list:
+        query = self.client.table("users").select("id, email, password").order("id").limit(limit)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        return query.execute().data or []
+
+    def replace_passwords(self, changes: list) -> int:
+        payload = [{"id": user_id, "old_hash": old, "new_hash": new} for user_id, old, new in changes]
+        # Função replace_user_passwords (ver sql/replace_user_passwords.sql): um UPDATE por lote
+        try:
+            result = self.client.rpc("replace_user_passwords", {"p_changes": payload}).execute()
+            return result.data or 0
+        except Exception as e:
+            print(f"RPC replace_user_passwords indisponível, atualizando um a um: {e}")
+        updated = 0
+        for user_id, old, new in changes:
+            result = (self.client.table("users").update({"password": new})
+                      .eq("id", user_id).eq("password", old).execute())
+            updated += len(result.data or [])
+        return updated
+
+    def list_tasks(self, user_id: str) -> list:
+        result = self.client.table("tasks").select(TASK_LIST_COLUMNS).eq("user_id", user_id).execute()
+        return result.data or []
+
+    def get_task(self, task_id: str) -> dict:
+        result = self.client.table("tasks").select(TASK_DETAIL_COLUMNS).eq("id", task_id).execute()
+        return result.data[0] if result.data else None
+
+    def query_tasks(self, user_id: str, completed: bool, priority: str = "all",
+                    task_type: str = "all", sort: str = "priority") -> list:
+        query = self.client.table("tasks").select(TASK_LIST_COLUMNS).eq("user_id", user_id).eq("completed", completed)
+        column, desc = _SORT_ORDERS.get(sort, _SORT_ORDERS["priority"])
+        return self._filtered(query, priority, task_type).order(column, desc=desc).execute().data or []
+
+    def page_tasks(self, user_id: str, completed: bool, column: str, cursor: tuple, limit: int,
+                   priority: str = "all", task_type: str = "all") -> list:
+        query = self.client.table("tasks").select(TASK_LIST_COLUMNS).eq("user_id", user_id).eq("completed", completed)
+        query = self._filtered(query, priority, task_type)
+        if cursor:
+            value, last_id = cursor
+            query = query.or_(f'{column}.lt."{value}",and({column}.eq."{value}",id.lt."{last_id}")')
+        result = query.order(column, desc=True).order("id", desc=True).limit(limit).execute()
+        return result.data or []
+
+    def due_tasks(self, user_id: str, due_date: str) -> list:
+        result = (self.client.table("tasks").select(TASK_DETAIL_COLUMNS).eq("user_id", user_id)
+                  .eq("due_date", due_date).eq("completed", False).execute())
+        return result.data or []
+
+    def upcoming_due_tasks(self, start: str, end: str) -> list:
+        result = (self.client.table("tasks").select(TASK_DETAIL_COLUMNS).gte("due_date", start)
+                  .lt("due_date", end).eq("completed", False).order("due_date").execute())
+        return result.data or []
+
+    def claim_reminder(self, task_id: str, due_date: str) -> bool:
+        # UPDATE condicional: só um processo encontra notified_at diferente do vencimento
+        result = (self.client.table("tasks").update({"notified_at": due_date})
+                  .eq("id", task_id).eq("due_date", due_date).eq("completed", False)
+                  .or_(f'notified_at.is.null,notified_at.neq."{due_date}"').execute())
+        return bool(result.data)
+
+    def insert_tasks(self, rows: list) -> list:
+        return self.client.table("tasks").insert(rows).execute().data or []
+
+    def update_tasks(self, task_ids: list, updates: dict) -> list:
+        return self.client.table("tasks").update(updates).in_("id", task_ids).execute().data or []
+
+    def delete_tasks(self, task_ids: list) -> list:
+        return self.client.table("tasks").delete().in_("id", task_ids).execute().data or []
+
+    def delete_user_tasks(self, user_id: str, limit: int) -> int:
+        # Função purge_user_tasks (ver sql/purge_user_tasks.sql): um lote por chamada
+        try:
+            result = self.client.rpc("purge_user_tasks", {"p_user_id": user_id, "p_limit": limit}).execute()
+            return result.data or 0
+        except Exception as e:
+            print(f"RPC purge_user_tasks indisponível, excluindo por ids: {e}")
+        rows = self.client.table("tasks").select("id").eq("user_id", user_id).limit(limit).execute().data or []
+        if not rows:
+            return 0
+        return len(self.delete_tasks([row["id"] for row in rows]))
+
+    def count_tasks(self, user_id: str, **filters) -> int:
+        # COUNT(*) no banco sem trazer nenhuma linha
+        query = self.client.table("tasks").select("id", count="exact", head=True).eq("user_id", user_id)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        return query.execute().count or 0
+
+    def task_stats(self, user_id: str) -> dict:
+        # Função task_stats (ver sql/task_stats.sql); None se não estiver instalada
+        try:
+            result = self.client.rpc("task_stats", {"p_user_id": user_id}).execute()
+        except Exception as e:
+            print(f"RPC task_stats indisponível, usando contagens: {e}")
+            return None
+        row = result.data[0] if isinstance(result.data, list) else result.data
+        return row or None
+
+    def ping(self) -> bool:
+        self.client.table("users").select("count", count="exact").execute()
+        return True
+
+# =============================
+# SQLite Backend
+# =============================
+SQLITE_SCHEMA = """
+create table if not exists users (
+    id text primary key,
+    username text not null unique,
+    email text not null unique,
+    password text not null,
+    theme_settings text,
+    created_at text not null,
+    session_epoch integer not null default 0
+);
+
+create table if not exists tasks (
+    id text primary key,
+    user_id text not null references users (id) on delete cascade,
+    title text not null,
+    description text default '',
+    due_date text default '',
+    type text default 'single',
+    priority text default 'medium',
+    completed integer not null default 0,
+    created_at text not null,
+    updated_at text not null,
+    notified_at text
+);
+
+create index if not exists tasks_user_completed_idx on tasks (user_id, completed);
+create index if not exists tasks_user_due_date_idx on tasks (user_id, due_date);
+create index if not exists tasks_pending_due_date_idx on tasks (due_date) where completed = 0;
+"""
+
+# Colunas acrescentadas depois da primeira versão do schema (tabela, coluna, definição)
+_SQLITE_ADDED_COLUMNS = [
+    ("users", "session_epoch", "integer not null default 0"),
+    ("tasks", "notified_at", "text")
+]
+
+_USER_FIELDS = set(_columns(USER_AUTH_COLUMNS))
+_USER_PUBLIC_FIELDS = set(_columns(USER_PUBLIC_COLUMNS))
+_TASK_FIELDS = set(_columns(TASK_DETAIL_COLUMNS))
+
+class SQLiteStore(TaskStore):
+    """Backend local para implantação em um único nó, testes e benchmarks.
+
+    Uma conexão por processo, protegida por lock (o Streamlit e a fila de
+    escrita usam threads diferentes).
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("pragma journal_mode = wal")
+            self._conn.execute("pragma foreign_keys = on")
+            self._conn.executescript(SQLITE_SCHEMA)
+            # Bancos criados antes dessas colunas
+            for table, column, definition in _SQLITE_ADDED_COLUMNS:
+                columns = {row["name"] for row in self._conn.execute(f"pragma table_info({table})")}
+                if column not in columns:
+                    self._conn.execute(f"alter table {table} add column {column} {definition}")
+
+    def _rows(self, sql: str, params=()) -> list:
+        with self._lock:
+            return [self._decode(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def _write(self, sql: str, params=()) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> dict:
+        data = dict(row)
+        if "completed" in data:
+            data["completed"] = bool(data["completed"])
+        if isinstance(data.get("theme_settings"), str):
+            data["theme_settings"] = json.loads(data["theme_settings"])
+        return data
+
+    @staticmethod
+    def _encode(data: dict, allowed: set) -> dict:
+        unknown = set(data) - allowed
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {', '.join(sorted(unknown))}")
+        encoded = dict(data)
+        if "theme_settings" in encoded:
+            encoded["theme_settings"] = json.dumps(encoded["theme_settings"])
+        if "completed" in encoded:
+            encoded["completed"] = int(bool(encoded["completed"]))
+        return encoded
+
+    @staticmethod
+    def _filters(priority: str, task_type: str) -> tuple:
+        sql, params = "", []
+        if priority != "all":
+            sql += " and priority = ?"
+            params.append(priority)
+        if task_type != "all":
+            sql += " and type = ?"
+            params.append(task_type)
+        return sql, params
+
+    @staticmethod
+    def _in(values: list) -> str:
+        return ", ".join("?" for _ in values)
+
+    def insert_user(self, data: dict) -> dict:
+        row = self._encode({"id": str(uuid.uuid4()), "created_at": _now(), **data}, _USER_FIELDS)
+        names = list(row)
+        try:
+            self._write(f"insert into users ({', '.join(names)}) values ({self._in(names)})",
+                        [row[name] for name in names])
+        except sqlite3.IntegrityError as e:
+            if "UNIQUE" not in str(e):
+                raise
+            raise DuplicateUserError(_duplicate_field(str(e))) from e
+        # Mesma forma de find_user, sem reler a linha
+        return {name: value for name, value in self._decode(row).items() if name in _USER_PUBLIC_FIELDS}
+
+    def find_user(self, field: str, value: str, with_password: bool = False) -> dict:
+        if field not in ("id", "email", "username"):
+            raise ValueError(f"Campo de busca inválido: {field}")
+        columns = USER_AUTH_COLUMNS if with_password else USER_PUBLIC_COLUMNS
+        rows = self._rows(f"select {columns} from users where {field} = ?", (value,))
+        return rows[0] if rows else None
+
+    def update_user(self, email: str, updates: dict) -> dict:
+        row = self._encode(updates, _USER_FIELDS)
+        if row:
+            self._write(f"update users set {', '.join(f'{name} = ?' for name in row)} where email = ?",
+                        [*row.values(), email])
+        return self.find_user("email", updates.get("email", email))
+
+    def delete_user(self, email: str) -> None:
+        self._write("delete from users where email = ?", (email,))
+
+    def session_epoch(self, user_id: str) -> int:
+        rows = self._rows("select session_epoch from users where id = ?", (user_id,))
+        return rows[0]["session_epoch"] if rows else None
+
+    def revoke_sessions(self, user_id: str) -> int:
+        epoch = _new_epoch()
+        self._write("update users set session_epoch = ? where id = ?", (epoch, user_id))
+        return epoch
+
+    def page_user_credentials(self, after_id: str, limit: int) -> list:
+        return self._rows("select id, email, password from users where id > ? order by id limit ?",
+                          (after_id or "", limit))
+
+    def replace_passwords(self, changes: list) -> int:
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("update users set password = ? where id = ? and password = ?",
+                                   [(new, user_id, old) for user_id, old, new in changes])
+            return self._conn.total_changes - before
+
+    def list_tasks(self, user_id: str) -> list:
+        return self._rows(f"select {TASK_LIST_COLUMNS} from tasks where user_id = ?", (user_id,))
+
+    def get_task(self, task_id: str) -> dict:
+        rows = self._rows(f"select {TASK_DETAIL_COLUMNS} from tasks where id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def query_tasks(self, user_id: str, completed: bool, priority: str = "all",
+                    task_type: str = "all", sort: str = "priority") -> list:
+        column, desc = _SORT_ORDERS.get(sort, _SORT_ORDERS["priority"])
+        filters, params = self._filters(priority, task_type)
+        return self._rows(
+            f"select {TASK_LIST_COLUMNS} from tasks where user_id = ? and completed = ?{filters}"
+            f" order by {column} {'desc' if desc else 'asc'}",
+            [user_id, int(completed), *params])
+
+    def page_tasks(self, user_id: str, completed: bool, column: str, cursor: tuple, limit: int,
+                   priority: str = "all", task_type: str = "all") -> list:
+        if column not in ("created_at", "updated_at"):
+            raise ValueError(f"Coluna de paginação inválida: {column}")
+        filters, params = self._filters(priority, task_type)
+        if cursor:
+            value, last_id = cursor
+            filters += f" and ({column} < ? or ({column} = ? and id < ?))"
+            params += [value, value, last_id]
+        return self._rows(
+            f"select {TASK_LIST_COLUMNS} from tasks where user_id = ? and completed = ?{filters}"
+            f" order by {column} desc, id desc limit ?",
+            [user_id, int(completed), *params, limit])
+
+    def due_tasks(self, user_id: str, due_date: str) -> list:
+        return self._rows(
+            f"select {TASK_DETAIL_COLUMNS} from tasks where user_id = ? and due_date = ? and completed = 0",
+            (user_id, due_date))
+
+    def upcoming_due_tasks(self, start: str, end: str) -> list:
+        return self._rows(
+            f"select {TASK_DETAIL_COLUMNS} from tasks where due_date >= ? and due_date < ? and completed = 0 "
+            "order by due_date", (start, end))
+
+    def claim_reminder(self, task_id: str, due_date: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "update tasks set notified_at = ? where id = ? and due_date = ? and completed = 0"
+                " and (notified_at is null or notified_at <> ?)", (due_date, task_id, due_date, due_date))
+            return cursor.rowcount == 1
+
+    def insert_tasks(self, rows: list) -> list:
+        now = _now()
+        rows = [self._encode({"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **row}, _TASK_FIELDS)
+                for row in rows]
+        with self._lock, self._conn:
+            for row in rows:
+                names = list(row)
+                self._conn.execute(f"insert into tasks ({', '.join(names)}) values ({self._in(names)})",
+                                   [row[name] for name in names])
+        return self._select_ids([row["id"] for row in rows])
+
+    def _select_ids(self, task_ids: list) -> list:
+        rows = self._rows(f"select {TASK_DETAIL_COLUMNS} from tasks where id in ({self._in(task_ids)})", task_ids)
+        by_id = {row["id"]: row for row in rows}
+        # Mesma ordem dos ids pedidos (a fila casa as respostas por posição)
+        return [by_id[task_id] for task_id in task_ids if task_id in by_id]
+
+    def update_tasks(self, task_ids: list, updates: dict) -> list:
+        row = self._encode({"updated_at": _now(), **updates}, _TASK_FIELDS)
+        self._write(f"update tasks set {', '.join(f'{name} = ?' for name in row)} where id in ({self._in(task_ids)})",
+                    [*row.values(), *task_ids])
+        return self._select_ids(task_ids)
+
+    def delete_tasks(self, task_ids: list) -> list:
+        with self._lock, self._conn:
+            rows = self._conn.execute(f"select id, user_id from tasks where id in ({self._in(task_ids)})",
+                                      task_ids).fetchall()
+            self._conn.execute(f"delete from tasks where id in ({self._in(task_ids)})", task_ids)
+        return [dict(row) for row in rows]
+
+    def delete_user_tasks(self, user_id: str, limit: int) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "delete from tasks where id in (select id from tasks where user_id = ? limit ?)", (user_id, limit)
+            ).rowcount
+
+    def count_tasks(self, user_id: str, **filters) -> int:
+        unknown = set(filters) - _TASK_FIELDS
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {', '.join(sorted(unknown))}")
+        sql = "select count(*) from tasks where user_id = ?" + "".join(f" and {c} = ?" for c in filters)
+        params = [user_id, *(int(v) if isinstance(v, bool) else v for v in filters.values())]
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def task_stats(self, user_id: str) -> dict:
+        # Sem _decode: aqui "completed" é uma contagem, não a coluna booleana
+        sql = """select count(*) as total,
+                        coalesce(sum(completed), 0) as completed,
+                        coalesce(sum(priority = 'high'), 0) as high,
+                        coalesce(sum(coalesce(priority, 'medium') = 'medium'), 0) as medium,
+                        coalesce(sum(priority = 'low'), 0) as low,
+                        coalesce(sum(type = 'daily'), 0) as daily,
+                        coalesce(sum(type = 'single'), 0) as single
+                 from tasks where user_id = ?"""
+        with self._lock:
+            row = self._conn.execute(sql, (user_id,)).fetchone()
+        return dict(row)
+
+    def ping(self) -> bool:
+        with self._lock:
+            self._conn.execute("select 1")
+        return True
+
+# =============================
+# Backend Selection
+# =============================
+def create_store(backend: str = None) -> TaskStore:
+    """Build the backend named by NEUROTASK_STORAGE ('supabase' ou 'sqlite')"""
+    backend = (backend or os.getenv("NEUROTASK_STORAGE", "supabase")).lower()
+    if backend == "sqlite":
+        path = os.getenv("NEUROTASK_SQLITE_PATH", SQLITE_PATH)
+        print(f"✓ Usando SQLite em {path}")
+        return SQLiteStore(path)
+    if backend != "supabase":
+        raise ValueError(f"NEUROTASK_STORAGE inválido: {backend}")
+
+    # Importado aqui para o modo SQLite funcionar sem o pacote supabase; o
+    # cliente só é criado na primeira consulta (importar o app não vai à rede)
+    from supabase_client import get_supabase
+    return SupabaseStore(get_supabase)
@@ -0,0 +1,505 @@
+"""
+NeuroTask - Temas
+Paletas de cores e geração do CSS, servido como arquivo estático versionado
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+THEME_CSS_DIR = os.path.join(STATIC_DIR, "css")
+
+# =============================
+# Theme Configuration - Cores Suaves e Pastéis
+# =============================
+THEMES = {
+    "light_lavender": {
+        "name": "Lavanda Claro (Foco)",
+        "primary": "#F3E5F5",
+        "secondary": "#E1BEE7",
+        "accent": "#D7C4F3",
+        "background": "#FAFAFA",
+        "surface": "#FFFFFF",
+        "text": "#6A1B9A",
+        "text_secondary": "#7B1FA2",
+        "success": "#A5D6A7", # Verde Suave (Baixa)
+
+        "warning": "#FFE082", # Amarelo Suave (Média)
+
+        "error": "#EF9A9A", # Vermelho Suave (Alta)
+
+        "border": "#E0E0E0",
+        "shadow": "rgba(0, 0, 0, 0.08)",
+        "hover": "#F5F5F5"
+    },
+    "light_mint": {
+        "name": "Menta Claro (Calma)",
+        "primary": "#E8F5E9",
+        "secondary": "#C8E6C9",
+        "accent": "#81C784",
+        "background": "#FAFAFA",
+        "surface": "#FFFFFF",
+        "text": "#2E7D32",
+        "text_secondary": "#66BB6A",
+        "success": "#A5D6A7", # Verde Suave (Baixa)
+
+        "warning": "#FFE082", # Amarelo Suave (Média)
+
+        "error": "#EF9A9A", # Vermelho Suave (Alta)
+
+        "border": "#E0E0E0",
+        "shadow": "rgba(0, 0, 0, 0.08)",
+        "hover": "#F5F5F5"
+    },
+    "light_peach": {
+        "name": "Pêssego Claro (Acolhedor)",
+        "primary": "#FFF3E0",
+        "secondary": "#FFE0B2",
+        "accent": "#FFB74D",
+        "background": "#FAFAFA",
+        "surface": "#FFFFFF",
+        "text": "#E65100",
+        "text_secondary": "#FF9800",
+        "success": "#C5E1A5",
+        "warning": "#FFCC80",
+        "error": "#FFAB91",
+        "border": "#E0E0E0",
+        "shadow": "rgba(0, 0, 0, 0.08)",
+        "hover": "#FFF8F0"
+    },
+    "dark_lavender": {
+        "name": "Lavanda Escuro (Foco)",
+        "primary": "#311B92",
+        "secondary": "#4527A0",
+        "accent": "#D7C4F3",
+        "background": "#1A1A1A",
+        "surface": "#263238",
+        "text": "#6A1B9A",
+        "text_secondary": "#CE93D8",
+        "success": "#81C784",
+        "warning": "#FFD54F",
+        "error": "#E57373",
+        "border": "#37474F",
+        "shadow": "rgba(0, 0, 0, 0.3)",
+        "hover": "#2C393F"
+    },
+ "dark_mint": {
+    "name": "Menta Escuro (Calma)",
+    "primary": "#145A1A",
+    "secondary": "#1C7A2A",
+    "accent": "#81C784",
+    "background": "#121212",
+    "surface": "#1E272C",
+    "text": "#1C8701",
+    "text_secondary": "#B2DFDB",
+    "success": "#66BB6A",
+    "warning": "#FFD54F",
+    "error": "#E57373",
+    "border": "#37474F",
+    "shadow": "rgba(0, 0, 0, 0.5)",
+    "hover": "#263238"
+},
+    "dark_brown": {
+        "name": "Marrom Escuro (Acolhedor)",
+        "primary": "#A06F53",
+        "secondary": "#4E342E",
+        "accent": "#FFAB40",
+        "background": "#1A1A1A",
+        "surface": "#3E2723",
+        "text": "#5E3206",
+        "text_secondary": "#BCAAA4",
+        "success": "#AED581",
+        "warning": "#FFB74D",
+        "error": "#FF8A65",
+        "border": "#4E342E",
+        "shadow": "rgba(0, 0, 0, 0.3)",
+        "hover": "#4A2C24"
+    }
+}
+
+@lru_cache(maxsize=len(THEMES))
+def build_theme_css(theme_key):
+    """Gera o CSS de um tema uma única vez por processo."""
+    theme = THEMES[theme_key]
+    
+    return f"""
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+    
+    * {{
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+        box-sizing: border-box;
+    }}
+    
+    .main {{
+        background-color: {theme['background']};
+        padding: 0;
+    }}
+    
+    .block-container {{
+        padding: 2rem 1rem;
+        max-width: 1400px;
+    }}
+    
+    /* Task Cards - Blocos Visuais Dinâmicos */
+    .task-card {{
+        background: {theme['surface']};
+        border: 1px solid {theme['border']};
+        border-radius: 12px;
+        padding: 20px 24px;
+        margin: 16px 0;
+        box-shadow: 0 2px 8px {theme['shadow']};
+        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+        position: relative;
+        overflow: hidden;
+    }}
+    
+    .task-card::before {{
+        content: '';
+        position: absolute;
+        left: 0;
+        top: 0;
+        bottom: 0;
+        width: 4px;
+        background: {theme['accent']};
+        transition: width 0.3s ease;
+    }}
+    
+    .task-card:hover {{
+        box-shadow: 0 6px 20px {theme['shadow']};
+        transform: translateY(-2px);
+        border-color: {theme['accent']};
+    }}
+    
+    .task-card:hover::before {{
+        width: 6px;
+    }}
+    
+    .task-completed {{
+        opacity: 0.65;
+        background: {theme['primary']};
+    }}
+    
+    .task-completed::before {{
+        background: {theme['success']} !important;
+    }}
+    
+    /* Cores de Prioridade Suaves - Bordas */
+    .task-priority-high::before {{
+        background: {theme['error']} !important; /* Vermelho Suave */
+    }}
+    
+    .task-priority-medium::before {{
+        background: {theme['warning']} !important; /* Amarelo Suave */
+    }}
+    
+    .task-priority-low::before {{
+        background: {theme['success']} !important; /* Verde Suave */
+    }}
+    
+    .task-title {{
+        font-size: 18px;
+        font-weight: 600;
+        color: {theme['text']};
+        margin: 0 0 8px 0;
+        line-height: 1.4;
+    }}
+    
+    .task-description {{
+        font-size: 14px;
+        color: {theme['text_secondary']};
+        margin: 8px 0;
+        line-height: 1.6;
+    }}
+    
+    .task-meta {{
+        font-size: 13px;
+        color: {theme['text_secondary']};
+        margin-top: 12px;
+        display: flex;
+        gap: 16px;
+        flex-wrap: wrap;
+    }}
+    
+    .task-meta-item {{
+        display: inline-flex;
+        align-items: center;
+        gap: 4px;
+    }}
+    
+    /* Priority Badges */
+    .priority-badge {{
+        display: inline-block;
+        padding: 4px 12px;
+        border-radius: 16px;
+        font-size: 11px;
+        font-weight: 600;
+        text-transform: uppercase;
+        letter-spacing: 0.5px;
+    }}
+    
+    /* Cores de Prioridade Suaves - Badges */
+    .priority-high {{
+        background: {theme['error']};
+        color: {theme['text']}; /* Texto escuro para contraste suave */
+    }}
+    
+    .priority-medium {{
+        background: {theme['warning']};
+        color: {theme['text']};
+    }}
+    
+    .priority-low {{
+        background: {theme['success']};
+        color: {theme['text']}; /* Texto escuro para contraste suave */
+    }}
+    
+    /* Stats Cards */
+    .stats-card {{
+        background: {theme['surface']};
+        border: 1px solid {theme['border']};
+        padding: 24px;
+        border-radius: 12px;
+        text-align: center;
+        box-shadow: 0 2px 8px {theme['shadow']};
+        transition: all 0.3s ease;
+    }}
+    
+    .stats-card:hover {{
+        transform: translateY(-4px);
+        box-shadow: 0 6px 16px {theme['shadow']};
+    }}
+    
+    .stats-number {{
+        font-size: 36px;
+        font-weight: 700;
+        color: {theme['accent']};
+        line-height: 1;
+        margin-bottom: 8px;
+    }}
+    
+    .stats-label {{
+        font-size: 12px;
+        color: {theme['text_secondary']};
+        font-weight: 500;
+        text-transform: uppercase;
+        letter-spacing: 0.5px;
+    }}
+    
+    /* Page Headers */
+    .page-header {{
+        font-size: 32px;
+        font-weight: 700;
+        color: {theme['text']};
+        margin-bottom: 8px;
+        letter-spacing: -0.5px;
+    }}
+    
+    .page-subtitle {{
+        font-size: 16px;
+        color: {theme['text_secondary']};
+        margin-bottom: 32px;
+    }}
+    
+    .section-title {{
+        font-size: 14px;
+        font-weight: 600;
+        color: {theme['text_secondary']};
+        text-transform: uppercase;
+        letter-spacing: 1px;
+        margin: 32px 0 16px 0;
+    }}
+    
+    /* Profile Card */
+    .profile-card {{
+        background: {theme['surface']};
+        border-radius: 12px;
+        padding: 32px;
+        box-shadow: 0 2px 8px {theme['shadow']};
+        border: 1px solid {theme['border']};
+    }}
+    
+    /* Buttons */
+    .stButton button {{
+        background-color: {theme['accent']};
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 12px 24px;
+        font-weight: 500;
+        font-size: 14px;
+        transition: all 0.2s ease;
+        width: 100%;
+    }}
+    
+    .stButton button:hover {{
+        background-color: {theme['accent']};
+        opacity: 0.9;
+        transform: translateY(-1px);
+        box-shadow: 0 4px 12px {theme['shadow']};
+    }}
+    
+    /* Sidebar */
+    div[data-testid="stSidebarContent"] {{
+        background-color: {theme['surface']};
+        border-right: 1px solid {theme['border']};
+    }}
+    
+    /* Forms */
+    .stTextInput input, .stTextArea textarea, .stSelectbox select {{
+        border-radius: 8px;
+        border: 1px solid {theme['border']};
+        background-color: {theme['surface']};
+        color: {theme['text']};
+        padding: 12px;
+        font-size: 14px;
+    }}
+    
+    .stTextInput input:focus, .stTextArea textarea:focus {{
+        border-color: {theme['accent']};
+        box-shadow: 0 0 0 2px {theme['primary']};
+    }}
+    
+    /* Checkbox */
+    .stCheckbox {{
+        margin-top: 8px;
+    }}
+    
+    /* Mobile Responsive */
+    @media (max-width: 768px) {{
+        .block-container {{
+            padding: 1rem 0.5rem;
+        }}
+        
+        .task-card {{
+            padding: 16px;
+            margin: 12px 0;
+        }}
+        
+        .task-title {{
+            font-size: 16px;
+        }}
+        
+        .stats-number {{
+            font-size: 28px;
+        }}
+        
+        .page-header {{
+            font-size: 24px;
+        }}
+    }}
+    
+    /* Notification */
+    .notification-popup {{
+        position: fixed;
+        bottom: 20px;
+        right: 20px;
+        background-color: {theme['surface']};
+        color: {theme['text']};
+        padding: 15px 25px;
+        border-radius: 8px;
+        box-shadow: 0 4px 12px {theme['shadow']};
+        border-left: 5px solid {theme['accent']};
+        z-index: 1000;
+        opacity: 0;
+        transform: translateY(20px);
+        transition: opacity 0.3s ease-out, transform 0.3s ease-out;
+    }}
+    
+    .notification-popup.show {{
+        opacity: 1;
+        transform: translateY(0);
+    }}
+    
+    .notification-title {{
+        font-weight: 600;
+        margin-bottom: 5px;
+    }}
+    
+    .notification-time {{
+        font-size: 12px;
+        color: {theme['text_secondary']};
+    }}
+    
+    /* Login Screen Specific Styles */
+    .login-container {{
+        background-color: transparent; /* Fundo transparente para não criar uma caixa branca */
+        padding: 40px;
+        border-radius: 16px;
+        box-shadow: none; /* Sem sombra */
+        max-width: 500px;
+        margin: 80px auto;
+        border: none; /* Sem borda */
+    }}
+    
+    .login-header {{
+        font-size: 40px;
+        font-weight: 800;
+        color: {theme['accent']}; /* Destaque com a cor de acento */
+        text-align: center;
+        margin-bottom: 10px;
+        letter-spacing: 1px;
+        text-shadow: 1px 1px 2px {theme['shadow']};
+    }}
+    
+    .login-slogan {{
+        font-size: 18px;
+        font-weight: 500;
+        color: {theme['text_secondary']};
+        text-align: center;
+        margin-bottom: 30px;
+        line-height: 1.4;
+    }}
+    
+    /* Streamlit Overrides */
+    div[data-testid="stAppViewBlockContainer"] {{
+        background-color: {theme['background']};
+    }}
+    
+    /* Fix for Streamlit's default header/footer */
+    header {{
+        background-color: transparent !important;
+    }}
+    
+    footer {{
+        visibility: hidden;
+    }}
+    """
+
+# =============================
+# Static Stylesheets
+# =============================
+def theme_stylesheet_name(theme_key):
+    """Nome do arquivo com hash do conteúdo (ex.: theme-light_mint.1a2b3c4d.css)."""
+    digest = hashlib.sha256(build_theme_css(theme_key).encode("utf-8")).hexdigest()[:8]
+    return f"theme-{theme_key}.{digest}.css"
+
+def write_theme_stylesheet(theme_key):
+    """Grava o CSS do tema em static/css e remove versões antigas do mesmo tema."""
+    name = theme_stylesheet_name(theme_key)
+    path = os.path.join(THEME_CSS_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(THEME_CSS_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(build_theme_css(theme_key))
+        os.replace(tmp_path, path)
+    for old in os.listdir(THEME_CSS_DIR):
+        if old.startswith(f"theme-{theme_key}.") and old.endswith(".css") and old != name:
+            os.remove(os.path.join(THEME_CSS_DIR, old))
+    return name
+
+@lru_cache(maxsize=len(THEMES))
+def theme_stylesheet_href(theme_key):
+    """URL do CSS do tema servido pelo Streamlit, ou None se não der para gravar o arquivo."""
+    try:
+        name = write_theme_stylesheet(theme_key)
+    except OSError as e:
+        print(f"Não foi possível gravar o CSS do tema {theme_key}: {e}")
+        return None
+    # O Streamlit serve a pasta static/ em app/static/ (server.enableStaticServing)
+    return f"app/static/css/{name}"
+
+if __name__ == "__main__":
+    # Gera os arquivos de todos os temas (útil antes do deploy)
+    for key in THEMES:
+        print(write_theme_stylesheet(key))
@@ -0,0 +1,278 @@
+"""
+NeuroTask - Tracing
+Spans leves por execução do script: duração e contagem de chamadas ao banco,
+CSS do tema, filtros e renderização dos cards.
+
+Cada rerun do Streamlit roda numa thread; begin_run()/end_run() delimitam a
+execução atual daquela thread. Spans fora de uma execução (fila de escrita,
+reruns de fragmento) entram apenas nos totais do processo.
+
+Orçamento de consultas:
+    Cada ida ao banco é contada por execução e marcada com a função que a fez
+    (o span aberto mais interno). No fim da execução, check_budget() avisa se
+    o total passou de NEUROTASK_QUERY_BUDGET ou se a mesma função repetiu a
+    mesma consulta mais de NEUROTASK_QUERY_REPEAT vezes (padrão N+1).
+    Com NEUROTASK_QUERY_STRICT=1 o aviso vira QueryBudgetExceeded (testes).
+
+Exportação:
+    NEUROTASK_TRACE_JSONL=/caminho/traces.jsonl  acrescenta uma linha por execução
+    NEUROTASK_TRACE_PROM=/caminho/neurotask.prom  reescreve os totais no formato
+                                                  de texto do Prometheus (textfile collector)
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+MAX_RECENT_RUNS = 200
+QUERY_BUDGET = int(os.getenv("NEUROTASK_QUERY_BUDGET", "8"))
+QUERY_REPEAT_LIMIT = int(os.getenv("NEUROTASK_QUERY_REPEAT", "3"))
+QUERY_STRICT = os.getenv("NEUROTASK_QUERY_STRICT") == "1"
+
+_local = threading.local()
+_lock = threading.Lock()
+_totals = {}  # span -> [chamadas, segundos]
+_runs = {"count": 0, "seconds": 0.0}
+_recent = deque(maxlen=MAX_RECENT_RUNS)
+_reported = set()  # avisos já impressos, para não repetir a cada rerun
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised by check_budget() in strict mode"""
+
+class RunTrace:
+    """Spans de uma execução do script"""
+
+    __slots__ = ("name", "started_at", "_started", "duration", "spans", "stack", "queries")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.duration = None
+        self.spans = {}  # span -> [chamadas, segundos, maior duração]
+        self.stack = []  # spans abertos, do mais externo ao mais interno
+        self.queries = {}  # (função, método do store) -> chamadas
+
+    def add_query(self, method: str) -> None:
+        caller = self.stack[-1] if self.stack else self.name
+        key = (caller, method)
+        self.queries[key] = self.queries.get(key, 0) + 1
+
+    @property
+    def query_count(self) -> int:
+        return sum(self.queries.values())
+
+    def budget_violations(self, budget: int = None, repeat_limit: int = None) -> list:
+        """Messages for a run over the query budget or with repeated queries"""
+        budget = QUERY_BUDGET if budget is None else budget
+        repeat_limit = QUERY_REPEAT_LIMIT if repeat_limit is None else repeat_limit
+        violations = []
+        total = self.query_count
+        if total > budget:
+            by_caller = ", ".join(f"{caller}.{method}={calls}"
+                                  for (caller, method), calls in sorted(self.queries.items()))
+            violations.append(f"{total} consultas (orçamento {budget}): {by_caller}")
+        for (caller, method), calls in sorted(self.queries.items()):
+            if calls > repeat_limit:
+                violations.append(f"{caller} chamou {method} {calls} vezes (possível N+1)")
+        return violations
+
+    def add(self, span: str, seconds: float) -> None:
+        entry = self.spans.get(span)
+        if entry is None:
+            self.spans[span] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def summary(self) -> list:
+        """(span, calls, total_ms, max_ms) rows, slowest first"""
+        rows = [(span, calls, seconds * 1000, longest * 1000)
+                for span, (calls, seconds, longest) in self.spans.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def to_dict(self) -> dict:
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "queries": {f"{caller}:{method}": calls for (caller, method), calls in self.queries.items()},
+            "spans": {span: {"calls": calls, "total_ms": round(total, 3), "max_ms": round(longest, 3)}
+                      for span, calls, total, longest in self.summary()}
+        }
+
+def current_run():
+    return getattr(_local, "run", None)
+
+def begin_run(name: str = "script") -> RunTrace:
+    """Start collecting spans for the script run on this thread"""
+    run = _local.run = RunTrace(name)
+    return run
+
+def end_run() -> RunTrace:
+    """Close the current run, update totals and export it"""
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    run.duration = time.perf_counter() - run._started
+    with _lock:
+        _runs["count"] += 1
+        _runs["seconds"] += run.duration
+        _recent.append(run)
+    _auto_export(run)
+    return run
+
+def record(span: str, seconds: float) -> None:
+    with _lock:
+        entry = _totals.setdefault(span, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+    run = current_run()
+    if run is not None:
+        run.add(span, seconds)
+
+def check_budget(run: RunTrace, budget: int = None, repeat_limit: int = None, strict: bool = None) -> list:
+    """Warn (ou levanta QueryBudgetExceeded no modo estrito) about a run's queries"""
+    violations = run.budget_violations(budget, repeat_limit)
+    if violations and (QUERY_STRICT if strict is None else strict):
+        raise QueryBudgetExceeded(f"{run.name}: " + "; ".join(violations))
+    for violation in violations:
+        key = (run.name, violation)
+        with _lock:
+            if key in _reported:
+                continue
+            _reported.add(key)
+        print(f"⚠ Orçamento de consultas em {run.name}: {violation}")
+    return violations
+
+class span:
+    """Context manager timing a block: with span("db.list_tasks"): ..."""
+
+    __slots__ = ("name", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        run = current_run()
+        if run is not None:
+            run.stack.append(self.name)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self._started)
+        run = current_run()
+        if run is not None and run.stack:
+            run.stack.pop()
+        return False
+
+def traced(name: str = None):
+    """Decorator recording each call of a function as a span"""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class TracedStore:
+    """Proxy de um TaskStore que registra cada ida ao banco como span 'db.<método>'"""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        timed = traced(f"db.{name}")(attr)
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            run = current_run()
+            if run is not None:
+                run.add_query(name)
+            return timed(*args, **kwargs)
+        # Guarda o método embrulhado para não recriá-lo a cada acesso
+        self.__dict__[name] = wrapper
+        return wrapper
+
+# =============================
+# Export
+# =============================
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text() -> str:
+    """Process totals in the Prometheus text exposition format"""
+    with _lock:
+        totals = {span_name: tuple(entry) for span_name, entry in _totals.items()}
+        runs = dict(_runs)
+    lines = [
+        "# HELP neurotask_runs_total Execuções do script registradas.",
+        "# TYPE neurotask_runs_total counter",
+        f"neurotask_runs_total {runs['count']}",
+        "# HELP neurotask_run_seconds_total Tempo acumulado das execuções do script.",
+        "# TYPE neurotask_run_seconds_total counter",
+        f"neurotask_run_seconds_total {runs['seconds']:.6f}",
+        "# HELP neurotask_span_calls_total Chamadas por span.",
+        "# TYPE neurotask_span_calls_total counter"
+    ]
+    lines += [f'neurotask_span_calls_total{{span="{_escape_label(s)}"}} {calls}'
+              for s, (calls, _) in sorted(totals.items())]
+    lines += [
+        "# HELP neurotask_span_seconds_total Tempo acumulado por span.",
+        "# TYPE neurotask_span_seconds_total counter"
+    ]
+    lines += [f'neurotask_span_seconds_total{{span="{_escape_label(s)}"}} {seconds:.6f}'
+              for s, (_, seconds) in sorted(totals.items())]
+    return "\n".join(lines) + "\n"
+
+def jsonl_text() -> str:
+    """Recent runs, one JSON object per line"""
+    with _lock:
+        runs = list(_recent)
+    return "".join(json.dumps(run.to_dict(), ensure_ascii=False) + "\n" for run in runs)
+
+def export_prometheus(path: str) -> None:
+    # Escrita atômica: o coletor nunca lê um arquivo pela metade
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+def export_jsonl(path: str, run: RunTrace = None) -> None:
+    """Append one run (ou todas as recentes) to a JSON lines file"""
+    with open(path, "a", encoding="utf-8") as f:
+        if run is None:
+            f.write(jsonl_text())
+        else:
+            f.write(json.dumps(run.to_dict(), ensure_ascii=False) + "\n")
+
+def _auto_export(run: RunTrace) -> None:
+    try:
+        jsonl_path = os.getenv("NEUROTASK_TRACE_JSONL")
+        if jsonl_path:
+            export_jsonl(jsonl_path, run)
+        prom_path = os.getenv("NEUROTASK_TRACE_PROM")
+        if prom_path:
+            export_prometheus(prom_path)
+    except OSError as e:
+        print(f"Erro ao exportar traces: {e}")
+
+def reset() -> None:
+    """Forget totals and recent runs"""
+    with _lock:
+        _totals.clear()
+        _reported.clear()
+        _runs.update(count=0, seconds=0.0)
+        _recent.clear()